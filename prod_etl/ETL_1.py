@@ -33,11 +33,15 @@ DIM_CODE_FILE   = DIM_DIR  / "dim_code.parquet"
 DIM_PAYER_FILE  = DIM_DIR  / "dim_payer.parquet"
 DIM_PG_FILE     = DIM_DIR  / "dim_provider_group.parquet"
 DIM_POS_FILE    = DIM_DIR  / "dim_pos_set.parquet"
+# Dense UINTEGER surrogate for pg_uid, so downstream joins hash 4-byte ints instead of md5 strings
+DIM_PG_KEY_FILE = DIM_DIR  / "dim_pg_key.parquet"
 
 XREF_PG_NPI     = XREF_DIR / "xref_pg_member_npi.parquet"
 XREF_PG_TIN     = XREF_DIR / "xref_pg_member_tin.parquet"
 
 GOLD_FACT_FILE  = GOLD_DIR / "fact_rate.parquet"
+# Hive-partitioned copy (state=XX/year_month=YYYY-MM/) so readers can prune whole files
+GOLD_FACT_PARTS = GOLD_DIR / "fact_rate"
 
 # Columns we’ll actually read (memory saver)
 RATES_COLS = [
@@ -375,7 +379,7 @@ def append_unique_parquet(df_new: pl.DataFrame, path: Path, keys: list[str]):
         con.execute(f"""
           COPY (
             SELECT * FROM read_parquet('{path}')
-            UNION ALL
+            UNION ALL BY NAME
             SELECT * FROM read_parquet('{tmp_new}')
           ) TO '{tmp_out}' (FORMAT PARQUET, COMPRESSION ZSTD);
         """)
@@ -400,6 +404,53 @@ append_unique_parquet(xref_pg_tin_new, XREF_PG_TIN, keys=["pg_uid","tin_value"])
 print("Dims/Xrefs up to date.")
 
 
+# %% [markdown]
+# Cell 6b — Integer provider-group keys
+
+# %%
+def write_pg_keys():
+    """Assign every pg_uid a stable dense pg_id and stamp it onto the xrefs"""
+    con = duckdb.connect()
+    if DIM_PG_KEY_FILE.exists():
+        con.execute(f"CREATE TABLE _keys AS SELECT pg_id, pg_uid FROM read_parquet('{DIM_PG_KEY_FILE}')")
+    else:
+        con.execute("CREATE TABLE _keys (pg_id UINTEGER, pg_uid VARCHAR)")
+    next_id = con.execute("SELECT COALESCE(MAX(pg_id), 0) FROM _keys").fetchone()[0]
+
+    # Existing ids never change, so files keyed on an older run stay valid
+    sources = " UNION ".join(
+        f"SELECT pg_uid FROM read_parquet('{p}')"
+        for p in (XREF_PG_NPI, XREF_PG_TIN, GOLD_FACT_FILE) if p.exists()
+    )
+    tmp_out = DIM_PG_KEY_FILE.with_suffix(".next.parquet")
+    con.execute(f"""
+      INSERT INTO _keys
+      SELECT CAST({next_id} + row_number() OVER (ORDER BY pg_uid) AS UINTEGER), pg_uid
+      FROM ({sources}) s
+      WHERE pg_uid IS NOT NULL AND pg_uid NOT IN (SELECT pg_uid FROM _keys);
+
+      COPY (SELECT * FROM _keys ORDER BY pg_id) TO '{tmp_out}' (FORMAT PARQUET, COMPRESSION ZSTD);
+    """)
+    con.close()
+    os.replace(tmp_out, DIM_PG_KEY_FILE)
+
+    keys = pl.read_parquet(DIM_PG_KEY_FILE)
+    for path in (XREF_PG_NPI, XREF_PG_TIN):
+        if not path.exists():
+            continue
+        tmp_out = path.with_suffix(".next.parquet")
+        (
+            pl.read_parquet(path)
+              .drop("pg_id", strict=False)
+              .join(keys, on="pg_uid", how="left")
+              .write_parquet(tmp_out, compression="zstd")
+        )
+        os.replace(tmp_out, path)
+    print(f"pg_id keys: {keys.height} provider groups in {DIM_PG_KEY_FILE}.")
+
+write_pg_keys()
+
+
 # %% [markdown]
 # Cell 7
 
@@ -447,6 +498,35 @@ fact_new.head(3)
 # cell 8
 
 # %%
+# negotiated_rate is stored as FLOAT32 in gold: rates carry at most cents and
+# round-trip exactly to 2dp for amounts below ~$130k, while halving the column
+# bytes every dashboard scan has to read. fact_uid is still derived from the
+# Float64 value upstream, so dedup keys are unaffected.
+FACT_RATE_CAST = "CAST(negotiated_rate AS FLOAT) AS negotiated_rate"
+# Every dashboard query filters on state + year_month; writing the single file
+# clustered on them keeps row-group min/max tight enough for readers to skip
+FACT_CLUSTER = "ORDER BY state, year_month"
+FACT_COPY_OPTIONS = "FORMAT PARQUET, COMPRESSION ZSTD, ROW_GROUP_SIZE 100000"
+
+def write_fact_partitions():
+    """Rewrite the hive-partitioned fact layout from the single gold fact file, carrying pg_id"""
+    con = duckdb.connect()
+    if DIM_PG_KEY_FILE.exists():
+        source = f"""
+          SELECT f.*, k.pg_id FROM read_parquet('{GOLD_FACT_FILE}') f
+          LEFT JOIN read_parquet('{DIM_PG_KEY_FILE}') k ON f.pg_uid = k.pg_uid
+        """
+    else:
+        source = f"SELECT * FROM read_parquet('{GOLD_FACT_FILE}')"
+    con.execute(f"""
+      COPY ({source})
+      TO '{GOLD_FACT_PARTS}' (FORMAT PARQUET, COMPRESSION ZSTD,
+                              PARTITION_BY (state, year_month), OVERWRITE 1);
+    """)
+    con.close()
+    print(f"Partitioned {GOLD_FACT_FILE} into {GOLD_FACT_PARTS}.")
+
+
 def upsert_fact_single(fact_batch: pl.DataFrame):
     if fact_batch.is_empty():
         print("No fact rows in batch.")
@@ -470,8 +550,8 @@ def upsert_fact_single(fact_batch: pl.DataFrame):
     con = duckdb.connect()
     if not GOLD_FACT_FILE.exists():
         con.execute(f"""
-          COPY (SELECT * FROM read_parquet('{tmp_new}'))
-          TO '{GOLD_FACT_FILE}' (FORMAT PARQUET, COMPRESSION ZSTD);
+          COPY (SELECT * REPLACE ({FACT_RATE_CAST}) FROM read_parquet('{tmp_new}') {FACT_CLUSTER})
+          TO '{GOLD_FACT_FILE}' ({FACT_COPY_OPTIONS});
         """)
         con.close()
         os.remove(tmp_new)
@@ -487,7 +567,7 @@ def upsert_fact_single(fact_batch: pl.DataFrame):
       LEFT JOIN _all a ON a.fact_uid = s.fact_uid
       WHERE a.fact_uid IS NULL;
 
-      COPY (SELECT * FROM _all) TO '{tmp_out}' (FORMAT PARQUET, COMPRESSION ZSTD);
+      COPY (SELECT * REPLACE ({FACT_RATE_CAST}) FROM _all {FACT_CLUSTER}) TO '{tmp_out}' ({FACT_COPY_OPTIONS});
     """)
     con.close()
 
@@ -496,6 +576,7 @@ def upsert_fact_single(fact_batch: pl.DataFrame):
     print(f"Upsert complete into {GOLD_FACT_FILE}.")
 
 upsert_fact_single(fact_new)
+write_fact_partitions()
 
 
 # %% [markdown]
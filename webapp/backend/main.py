@@ -5,6 +5,7 @@ Provides REST API endpoints for dashboard data access
 
 from fastapi import FastAPI, HTTPException, Query, Path as FastAPIPath
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from typing import List, Optional, Dict, Any
 import polars as pl
 import duckdb
@@ -54,13 +55,16 @@ def get_duckdb_connection():
     conn = duckdb.connect()
     return conn
 
+# Handlers that run DuckDB/Polars work are plain `def` so FastAPI runs them in
+# its threadpool instead of blocking the event loop
+
 @app.get("/")
 async def root():
     """Health check endpoint"""
     return {"message": "MRF Data Lookup API is running"}
 
 @app.get("/api/health")
-async def health_check():
+def health_check():
     """Detailed health check with data availability"""
     try:
         # Check if data files exist
@@ -98,7 +102,7 @@ async def health_check():
         return {"status": "error", "message": str(e)}
 
 @app.get("/api/rates/summary")
-async def get_rate_summary(
+def get_rate_summary(
     state: str = Query(..., description="State code (e.g., GA)"),
     year_month: str = Query(..., description="Year-month in YYYY-MM format"),
     payer: Optional[str] = Query(None, description="Filter by payer name"),
@@ -127,35 +131,44 @@ async def get_rate_summary(
         query = f"""
         SELECT 
             COUNT(*) as total_rates,
-            AVG(f.negotiated_rate) as avg_rate,
-            MIN(f.negotiated_rate) as min_rate,
-            MAX(f.negotiated_rate) as max_rate,
-            PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY f.negotiated_rate) as median_rate,
+            COALESCE(ROUND(AVG(f.negotiated_rate), 2), 0) as avg_rate,
+            COALESCE(ROUND(CAST(MIN(f.negotiated_rate) AS DOUBLE), 2), 0) as min_rate,
+            COALESCE(ROUND(CAST(MAX(f.negotiated_rate) AS DOUBLE), 2), 0) as max_rate,
+            COALESCE(ROUND(CAST(PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY f.negotiated_rate) AS DOUBLE), 2), 0) as median_rate,
             COUNT(DISTINCT f.code) as unique_procedures,
             COUNT(DISTINCT f.reporting_entity_name) as unique_payers
         {base_from}
-        WHERE f.state = '{state}' AND f.year_month = '{year_month}'
+        WHERE f.state = ? AND f.year_month = ?
         """
+        params = [state, year_month]
         
-        # Add filters
+        # Add filters; values are bound as parameters, never spliced into the SQL
         if payer:
-            query += f" AND f.reporting_entity_name ILIKE '%{payer}%'"
+            query += " AND f.reporting_entity_name ILIKE ?"
+            params.append(f"%{payer}%")
         if code_type:
-            query += f" AND f.code_type = '{code_type}'"
+            query += " AND f.code_type = ?"
+            params.append(code_type)
         if code:
-            query += f" AND f.code = '{code}'"
+            query += " AND f.code = ?"
+            params.append(code)
         if billing_class:
-            query += f" AND f.billing_class = '{billing_class}'"
+            query += " AND f.billing_class = ?"
+            params.append(billing_class)
         if tin_value:
-            query += f" AND x.tin_value = '{tin_value}'"
+            query += " AND x.tin_value = ?"
+            params.append(tin_value)
         if negotiated_type:
-            query += f" AND f.negotiated_type = '{negotiated_type}'"
+            query += " AND f.negotiated_type = ?"
+            params.append(negotiated_type)
         if negotiation_arrangement:
-            query += f" AND f.negotiation_arrangement = '{negotiation_arrangement}'"
+            query += " AND f.negotiation_arrangement = ?"
+            params.append(negotiation_arrangement)
         if pos_set_id:
-            query += f" AND f.pos_set_id = '{pos_set_id}'"
+            query += " AND f.pos_set_id = ?"
+            params.append(pos_set_id)
         
-        result = conn.execute(query).fetchone()
+        summary = conn.execute(query, params).pl().to_dicts()[0]
         
         return {
             "state": state,
@@ -170,15 +183,7 @@ async def get_rate_summary(
                 "negotiation_arrangement": negotiation_arrangement,
                 "pos_set_id": pos_set_id
             },
-            "summary": {
-                "total_rates": result[0],
-                "avg_rate": round(result[1], 2) if result[1] else 0,
-                "min_rate": round(result[2], 2) if result[2] else 0,
-                "max_rate": round(result[3], 2) if result[3] else 0,
-                "median_rate": round(result[4], 2) if result[4] else 0,
-                "unique_procedures": result[5],
-                "unique_payers": result[6]
-            }
+            "summary": summary
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -186,7 +191,7 @@ async def get_rate_summary(
         conn.close()
 
 @app.get("/api/rates/by-payer")
-async def get_rates_by_payer(
+def get_rates_by_payer(
     state: str = Query(..., description="State code"),
     year_month: str = Query(..., description="Year-month in YYYY-MM format"),
     limit: int = Query(50, description="Number of results to return")
@@ -197,37 +202,27 @@ async def get_rates_by_payer(
         
         query = f"""
         SELECT 
-            reporting_entity_name,
+            reporting_entity_name as payer_name,
             COUNT(*) as rate_count,
-            AVG(negotiated_rate) as avg_rate,
-            MIN(negotiated_rate) as min_rate,
-            MAX(negotiated_rate) as max_rate,
-            PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY negotiated_rate) as median_rate,
+            COALESCE(ROUND(AVG(negotiated_rate), 2), 0) as avg_rate,
+            COALESCE(ROUND(CAST(MIN(negotiated_rate) AS DOUBLE), 2), 0) as min_rate,
+            COALESCE(ROUND(CAST(MAX(negotiated_rate) AS DOUBLE), 2), 0) as max_rate,
+            COALESCE(ROUND(CAST(PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY negotiated_rate) AS DOUBLE), 2), 0) as median_rate,
             COUNT(DISTINCT code) as unique_procedures
         FROM read_parquet('{FACT_TABLE}')
-        WHERE state = '{state}' AND year_month = '{year_month}'
+        WHERE state = ? AND year_month = ?
         GROUP BY reporting_entity_name
         ORDER BY rate_count DESC
-        LIMIT {limit}
+        LIMIT ?
         """
         
-        result = conn.execute(query).fetchall()
+        # Rounding happens in SQL, so rows convert straight to dicts
+        payers = conn.execute(query, [state, year_month, limit]).pl().to_dicts()
         
         return {
             "state": state,
             "year_month": year_month,
-            "payers": [
-                {
-                    "payer_name": row[0],
-                    "rate_count": row[1],
-                    "avg_rate": round(row[2], 2) if row[2] else 0,
-                    "min_rate": round(row[3], 2) if row[3] else 0,
-                    "max_rate": round(row[4], 2) if row[4] else 0,
-                    "median_rate": round(row[5], 2) if row[5] else 0,
-                    "unique_procedures": row[6]
-                }
-                for row in result
-            ]
+            "payers": payers
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -235,7 +230,7 @@ async def get_rates_by_payer(
         conn.close()
 
 @app.get("/api/rates/by-procedure")
-async def get_rates_by_procedure(
+def get_rates_by_procedure(
     state: str = Query(..., description="State code"),
     year_month: str = Query(..., description="Year-month in YYYY-MM format"),
     code_type: Optional[str] = Query(None, description="Filter by code type"),
@@ -257,13 +252,17 @@ async def get_rates_by_procedure(
                 AND x.pg_uid = f.pg_uid
             """
         
-        where_conditions = [f"f.state = '{state}'", f"f.year_month = '{year_month}'"]
+        where_conditions = ["f.state = ?", "f.year_month = ?"]
+        params = [state, year_month]
         if code_type:
-            where_conditions.append(f"f.code_type = '{code_type}'")
+            where_conditions.append("f.code_type = ?")
+            params.append(code_type)
         if billing_class:
-            where_conditions.append(f"f.billing_class = '{billing_class}'")
+            where_conditions.append("f.billing_class = ?")
+            params.append(billing_class)
         if tin_value:
-            where_conditions.append(f"x.tin_value = '{tin_value}'")
+            where_conditions.append("x.tin_value = ?")
+            params.append(tin_value)
         
         where_clause = " AND ".join(where_conditions)
         
@@ -285,18 +284,19 @@ async def get_rates_by_procedure(
             code,
             code_desc,
             COUNT(*) as rate_count,
-            AVG(negotiated_rate) as avg_rate,
-            MIN(negotiated_rate) as min_rate,
-            MAX(negotiated_rate) as max_rate,
-            PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY negotiated_rate) as median_rate,
+            COALESCE(ROUND(AVG(negotiated_rate), 2), 0) as avg_rate,
+            COALESCE(ROUND(CAST(MIN(negotiated_rate) AS DOUBLE), 2), 0) as min_rate,
+            COALESCE(ROUND(CAST(MAX(negotiated_rate) AS DOUBLE), 2), 0) as max_rate,
+            COALESCE(ROUND(CAST(PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY negotiated_rate) AS DOUBLE), 2), 0) as median_rate,
             COUNT(DISTINCT reporting_entity_name) as unique_payers
         FROM rates_with_desc
         GROUP BY code_type, code, code_desc
         ORDER BY rate_count DESC
-        LIMIT {limit}
+        LIMIT ?
         """
+        params.append(limit)
         
-        result = conn.execute(query).fetchall()
+        procedures = conn.execute(query, params).pl().to_dicts()
         
         return {
             "state": state,
@@ -306,20 +306,7 @@ async def get_rates_by_procedure(
                 "billing_class": billing_class,
                 "tin_value": tin_value
             },
-            "procedures": [
-                {
-                    "code_type": row[0],
-                    "code": row[1],
-                    "code_desc": row[2],
-                    "rate_count": row[3],
-                    "avg_rate": round(row[4], 2) if row[4] else 0,
-                    "min_rate": round(row[5], 2) if row[5] else 0,
-                    "max_rate": round(row[6], 2) if row[6] else 0,
-                    "median_rate": round(row[7], 2) if row[7] else 0,
-                    "unique_payers": row[8]
-                }
-                for row in result
-            ]
+            "procedures": procedures
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -327,7 +314,7 @@ async def get_rates_by_procedure(
         conn.close()
 
 @app.get("/api/rates/detail")
-async def get_rate_details(
+def get_rate_details(
     state: str = Query(..., description="State code"),
     year_month: str = Query(..., description="Year-month in YYYY-MM format"),
     payer: Optional[str] = Query(None, description="Filter by payer name"),
@@ -350,25 +337,30 @@ async def get_rate_details(
                 AND x.pg_uid = f.pg_uid
             """
         
-        where_conditions = [f"f.state = '{state}'", f"f.year_month = '{year_month}'"]
+        where_conditions = ["f.state = ?", "f.year_month = ?"]
+        params = [state, year_month]
         if payer:
-            where_conditions.append(f"f.reporting_entity_name ILIKE '%{payer}%'")
+            where_conditions.append("f.reporting_entity_name ILIKE ?")
+            params.append(f"%{payer}%")
         if code:
-            where_conditions.append(f"f.code = '{code}'")
+            where_conditions.append("f.code = ?")
+            params.append(code)
         if billing_class:
-            where_conditions.append(f"f.billing_class = '{billing_class}'")
+            where_conditions.append("f.billing_class = ?")
+            params.append(billing_class)
         if tin_value:
-            where_conditions.append(f"x.tin_value = '{tin_value}'")
+            where_conditions.append("x.tin_value = ?")
+            params.append(tin_value)
         
         where_clause = " AND ".join(where_conditions)
         
         query = f"""
         SELECT 
-            f.reporting_entity_name,
+            f.reporting_entity_name as payer_name,
             f.code_type,
             f.code,
             COALESCE(d.code_desc, f.code) as code_desc,
-            f.negotiated_rate,
+            COALESCE(ROUND(CAST(f.negotiated_rate AS DOUBLE), 2), 0) as negotiated_rate,
             f.negotiated_type,
             f.negotiation_arrangement,
             f.expiration_date
@@ -377,10 +369,11 @@ async def get_rate_details(
             ON d.code_type = f.code_type AND d.code = f.code
         WHERE {where_clause}
         ORDER BY f.reporting_entity_name, f.code, f.negotiated_rate
-        LIMIT {limit}
+        LIMIT ?
         """
+        params.append(limit)
         
-        result = conn.execute(query).fetchall()
+        records = conn.execute(query, params).pl().to_dicts()
         
         return {
             "state": state,
@@ -391,19 +384,7 @@ async def get_rate_details(
                 "billing_class": billing_class,
                 "tin_value": tin_value
             },
-            "records": [
-                {
-                    "payer_name": row[0],
-                    "code_type": row[1],
-                    "code": row[2],
-                    "code_desc": row[3],
-                    "negotiated_rate": round(row[4], 2) if row[4] else 0,
-                    "negotiated_type": row[5],
-                    "negotiation_arrangement": row[6],
-                    "expiration_date": row[7]
-                }
-                for row in result
-            ]
+            "records": records
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -411,7 +392,7 @@ async def get_rate_details(
         conn.close()
 
 @app.get("/api/providers/search")
-async def search_providers(
+def search_providers(
     q: str = Query(..., description="Search query for provider name"),
     limit: int = Query(20, description="Number of results to return")
 ):
@@ -429,29 +410,18 @@ async def search_providers(
             primary_taxonomy_desc,
             status
         FROM read_parquet('{DIM_NPI}')
-        WHERE organization_name ILIKE '%{q}%' 
-           OR first_name ILIKE '%{q}%' 
-           OR last_name ILIKE '%{q}%'
+        WHERE organization_name ILIKE $pattern 
+           OR first_name ILIKE $pattern 
+           OR last_name ILIKE $pattern
         ORDER BY organization_name, last_name, first_name
-        LIMIT {limit}
+        LIMIT $limit
         """
         
-        result = conn.execute(query).fetchall()
+        providers = conn.execute(query, {"pattern": f"%{q}%", "limit": limit}).pl().to_dicts()
         
         return {
             "query": q,
-            "providers": [
-                {
-                    "npi": row[0],
-                    "organization_name": row[1],
-                    "first_name": row[2],
-                    "last_name": row[3],
-                    "enumeration_type": row[4],
-                    "primary_taxonomy_desc": row[5],
-                    "status": row[6]
-                }
-                for row in result
-            ]
+            "providers": providers
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -459,7 +429,7 @@ async def search_providers(
         conn.close()
 
 @app.get("/api/meta/available-data")
-async def get_available_data():
+def get_available_data():
     """Get available states, year_months, and payers"""
     try:
         conn = get_duckdb_connection()
@@ -475,7 +445,7 @@ async def get_available_data():
         ORDER BY state, year_month
         """
         
-        result = conn.execute(query).fetchall()
+        availability = conn.execute(query).pl().to_dicts()
         
         # Get unique payers
         payers_query = f"""
@@ -484,18 +454,11 @@ async def get_available_data():
         ORDER BY reporting_entity_name
         """
         
-        payers_result = conn.execute(payers_query).fetchall()
+        payers = conn.execute(payers_query).pl().to_series().to_list()
         
         return {
-            "data_availability": [
-                {
-                    "state": row[0],
-                    "year_month": row[1],
-                    "record_count": row[2]
-                }
-                for row in result
-            ],
-            "available_payers": [row[0] for row in payers_result]
+            "data_availability": availability,
+            "available_payers": payers
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -503,7 +466,7 @@ async def get_available_data():
         conn.close()
 
 @app.get("/api/meta/dimension-values")
-async def get_dimension_values(
+def get_dimension_values(
     state: str = Query(..., description="State code"),
     year_month: str = Query(..., description="Year-month in YYYY-MM format"),
     dimension: str = Query(..., description="Dimension name (billing_class, code_type, negotiated_type, negotiation_arrangement, tin_value)")
@@ -516,7 +479,7 @@ async def get_dimension_values(
             query = f"""
             SELECT DISTINCT billing_class, COUNT(*) as count
             FROM read_parquet('{FACT_TABLE}')
-            WHERE state = '{state}' AND year_month = '{year_month}'
+            WHERE state = ? AND year_month = ?
             GROUP BY billing_class
             ORDER BY count DESC
             """
@@ -524,7 +487,7 @@ async def get_dimension_values(
             query = f"""
             SELECT DISTINCT code_type, COUNT(*) as count
             FROM read_parquet('{FACT_TABLE}')
-            WHERE state = '{state}' AND year_month = '{year_month}'
+            WHERE state = ? AND year_month = ?
             GROUP BY code_type
             ORDER BY count DESC
             """
@@ -532,7 +495,7 @@ async def get_dimension_values(
             query = f"""
             SELECT DISTINCT negotiated_type, COUNT(*) as count
             FROM read_parquet('{FACT_TABLE}')
-            WHERE state = '{state}' AND year_month = '{year_month}'
+            WHERE state = ? AND year_month = ?
             GROUP BY negotiated_type
             ORDER BY count DESC
             """
@@ -540,7 +503,7 @@ async def get_dimension_values(
             query = f"""
             SELECT DISTINCT negotiation_arrangement, COUNT(*) as count
             FROM read_parquet('{FACT_TABLE}')
-            WHERE state = '{state}' AND year_month = '{year_month}'
+            WHERE state = ? AND year_month = ?
             GROUP BY negotiation_arrangement
             ORDER BY count DESC
             """
@@ -552,7 +515,7 @@ async def get_dimension_values(
                 ON x.year_month = f.year_month 
                 AND x.payer_slug = regexp_replace(lower(f.reporting_entity_name), '[^a-z0-9]+', '_')
                 AND x.pg_uid = f.pg_uid
-            WHERE f.state = '{state}' AND f.year_month = '{year_month}'
+            WHERE f.state = ? AND f.year_month = ?
             GROUP BY x.tin_value
             ORDER BY count DESC
             LIMIT 100
@@ -560,19 +523,15 @@ async def get_dimension_values(
         else:
             raise HTTPException(status_code=400, detail=f"Unknown dimension: {dimension}")
         
-        result = conn.execute(query).fetchall()
+        # Rename the dimension column so rows convert column-wise straight to {value, count}
+        values = conn.execute(query, [state, year_month]).pl()
+        values = values.rename({values.columns[0]: "value"}).to_dicts()
         
         return {
             "dimension": dimension,
             "state": state,
             "year_month": year_month,
-            "values": [
-                {
-                    "value": row[0],
-                    "count": row[1]
-                }
-                for row in result
-            ]
+            "values": values
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -584,7 +543,7 @@ async def get_dimension_values(
 # =============================================================================
 
 @app.get("/api/search/tin")
-async def search_by_tin(
+def search_by_tin(
     tin_value: str = Query(..., description="TIN value to search for"),
     state: str = Query(..., description="State code"),
     year_month: str = Query(..., description="Year-month in YYYY-MM format"),
@@ -607,7 +566,7 @@ async def search_by_tin(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/search/organization")
-async def search_by_organization(
+def search_by_organization(
     org_name: str = Query(..., description="Organization name to search for"),
     state: str = Query(..., description="State code"),
     year_month: str = Query(..., description="Year-month in YYYY-MM format"),
@@ -630,7 +589,7 @@ async def search_by_organization(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/search/taxonomy")
-async def search_by_taxonomy(
+def search_by_taxonomy(
     taxonomy_desc: str = Query(..., description="Taxonomy description to search for"),
     state: str = Query(..., description="State code"),
     year_month: str = Query(..., description="Year-month in YYYY-MM format"),
@@ -653,7 +612,7 @@ async def search_by_taxonomy(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/search/procedure-category")
-async def search_by_procedure_category(
+def search_by_procedure_category(
     proc_class: str = Query(..., description="Procedure class to search for"),
     state: str = Query(..., description="State code"),
     year_month: str = Query(..., description="Year-month in YYYY-MM format"),
@@ -676,7 +635,7 @@ async def search_by_procedure_category(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/search/billing-code")
-async def search_by_billing_code(
+def search_by_billing_code(
     billing_code: str = Query(..., description="Billing code to search for"),
     state: str = Query(..., description="State code"),
     year_month: str = Query(..., description="Year-month in YYYY-MM format"),
@@ -699,7 +658,7 @@ async def search_by_billing_code(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/search/payer")
-async def search_by_payer(
+def search_by_payer(
     payer_name: str = Query(..., description="Payer name to search for"),
     state: str = Query(..., description="State code"),
     year_month: str = Query(..., description="Year-month in YYYY-MM format"),
@@ -722,7 +681,7 @@ async def search_by_payer(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/search/multi-field")
-async def multi_field_search(
+def multi_field_search(
     state: str = Query(..., description="State code"),
     year_month: str = Query(..., description="Year-month in YYYY-MM format"),
     primary_taxonomy_desc: Optional[str] = Query(None, description="Primary taxonomy description filter"),
@@ -788,8 +747,54 @@ async def multi_field_search(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/search/multi-field/stream")
+def stream_multi_field_search(
+    state: str = Query(..., description="State code"),
+    year_month: str = Query(..., description="Year-month in YYYY-MM format"),
+    primary_taxonomy_desc: Optional[str] = Query(None, description="Primary taxonomy description filter"),
+    organization_name: Optional[str] = Query(None, description="Organization name filter (partial match)"),
+    npi: Optional[str] = Query(None, description="NPI filter"),
+    enumeration_type: Optional[str] = Query(None, description="Enumeration type filter (1=Individual, 2=Organization)"),
+    billing_class: Optional[str] = Query(None, description="Billing class filter"),
+    proc_set: Optional[str] = Query(None, description="Procedure set filter"),
+    proc_class: Optional[str] = Query(None, description="Procedure class filter"),
+    proc_group: Optional[str] = Query(None, description="Procedure group filter"),
+    billing_code: Optional[str] = Query(None, description="Billing code filter"),
+    tin_value: Optional[str] = Query(None, description="TIN value filter"),
+    payer: Optional[str] = Query(None, description="Payer name filter"),
+    limit: Optional[int] = Query(None, description="Number of results to return (all when omitted)")
+):
+    """Multi-field search streamed as NDJSON, one row per line, for large result sets"""
+    def parse_multi_value(value):
+        if not value:
+            return None
+        values = [v.strip() for v in value.split(',') if v.strip()]
+        return values if values else None
+
+    batches = get_optimized_queries().stream_multi_field_search(
+        state=state,
+        year_month=year_month,
+        primary_taxonomy_desc=parse_multi_value(primary_taxonomy_desc),
+        organization_name=parse_multi_value(organization_name),
+        npi=parse_multi_value(npi),
+        enumeration_type=parse_multi_value(enumeration_type),
+        billing_class=parse_multi_value(billing_class),
+        proc_set=parse_multi_value(proc_set),
+        proc_class=parse_multi_value(proc_class),
+        proc_group=parse_multi_value(proc_group),
+        billing_code=parse_multi_value(billing_code),
+        tin_value=parse_multi_value(tin_value),
+        payer=parse_multi_value(payer),
+        limit=limit
+    )
+    # Each Arrow batch is serialized column-wise by Polars and sent as soon as it is ready
+    return StreamingResponse(
+        (pl.from_arrow(batch).write_ndjson() for batch in batches),
+        media_type="application/x-ndjson"
+    )
+
 @app.get("/api/autocomplete/{field}")
-async def get_autocomplete_suggestions(
+def get_autocomplete_suggestions(
     field: str = FastAPIPath(..., description="Field to get suggestions for (organization, taxonomy, procedure_category, payer, tin)"),
     query: str = Query(..., description="Search query"),
     state: str = Query(..., description="State code"),
@@ -800,97 +805,98 @@ async def get_autocomplete_suggestions(
     try:
         conn = get_duckdb_connection()
         
-        # Simple field queries - just get distinct values
+        # Simple field queries - just get distinct values, as (sql, params)
         field_queries = {
-            "billing_class": f"""
+            "billing_class": (f"""
                 SELECT DISTINCT billing_class
                 FROM read_parquet('{FACT_TABLE}')
-                WHERE state = '{state}' AND year_month = '{year_month}'
+                WHERE state = ? AND year_month = ?
                   AND billing_class IS NOT NULL
                   AND billing_class != ''
                 ORDER BY billing_class
-                LIMIT {limit}
-            """,
-            "payer": f"""
+                LIMIT ?
+            """, [state, year_month, limit]),
+            "payer": (f"""
                 SELECT DISTINCT reporting_entity_name
                 FROM read_parquet('{FACT_TABLE}')
-                WHERE state = '{state}' AND year_month = '{year_month}'
+                WHERE state = ? AND year_month = ?
                   AND reporting_entity_name IS NOT NULL
                   AND reporting_entity_name != ''
                 ORDER BY reporting_entity_name
-                LIMIT {limit}
-            """,
-            "billing_code": f"""
+                LIMIT ?
+            """, [state, year_month, limit]),
+            "billing_code": (f"""
                 SELECT DISTINCT code
                 FROM read_parquet('{FACT_TABLE}')
-                WHERE state = '{state}' AND year_month = '{year_month}'
+                WHERE state = ? AND year_month = ?
                   AND code IS NOT NULL
                   AND code != ''
                 ORDER BY code
-                LIMIT {limit}
-            """,
-            "proc_class": f"""
+                LIMIT ?
+            """, [state, year_month, limit]),
+            "proc_class": (f"""
                 SELECT DISTINCT proc_class
                 FROM read_parquet('{DIM_CODE_CAT}')
                 WHERE proc_class IS NOT NULL
                   AND proc_class != ''
                 ORDER BY proc_class
-                LIMIT {limit}
-            """,
-            "proc_set": f"""
+                LIMIT ?
+            """, [limit]),
+            "proc_set": (f"""
                 SELECT DISTINCT proc_set
                 FROM read_parquet('{DIM_CODE_CAT}')
                 WHERE proc_set IS NOT NULL
                   AND proc_set != ''
                 ORDER BY proc_set
-                LIMIT {limit}
-            """,
-            "proc_group": f"""
+                LIMIT ?
+            """, [limit]),
+            "proc_group": (f"""
                 SELECT DISTINCT proc_group
                 FROM read_parquet('{DIM_CODE_CAT}')
                 WHERE proc_group IS NOT NULL
                   AND proc_group != ''
                 ORDER BY proc_group
-                LIMIT {limit}
-            """,
-            "primary_taxonomy_desc": f"""
+                LIMIT ?
+            """, [limit]),
+            "primary_taxonomy_desc": (f"""
                 SELECT DISTINCT primary_taxonomy_desc
                 FROM read_parquet('{DIM_NPI}')
                 WHERE primary_taxonomy_desc IS NOT NULL
                   AND primary_taxonomy_desc != ''
                 ORDER BY primary_taxonomy_desc
-                LIMIT {limit}
-            """,
-            "organization_name": f"""
+                LIMIT ?
+            """, [limit]),
+            "organization_name": (f"""
                 SELECT DISTINCT organization_name
                 FROM read_parquet('{DIM_NPI}')
                 WHERE organization_name IS NOT NULL
                   AND organization_name != ''
                 ORDER BY organization_name
-                LIMIT {limit}
-            """,
-            "npi": f"""
+                LIMIT ?
+            """, [limit]),
+            "npi": (f"""
                 SELECT DISTINCT npi
                 FROM read_parquet('{DIM_NPI}')
                 WHERE npi IS NOT NULL
                   AND npi != ''
                 ORDER BY npi
-                LIMIT {limit}
-            """,
-            "tin_value": f"""
+                LIMIT ?
+            """, [limit]),
+            "tin_value": (f"""
                 SELECT DISTINCT tin_value
                 FROM read_parquet('{XREF_GROUP_TIN}')
                 WHERE tin_value IS NOT NULL
                   AND tin_value != ''
                 ORDER BY tin_value
-                LIMIT {limit}
-            """
+                LIMIT ?
+            """, [limit])
         }
         
         if field not in field_queries:
             raise HTTPException(status_code=400, detail=f"Unknown field: {field}")
         
-        result = conn.execute(field_queries[field]).fetchall()
+        field_query, params = field_queries[field]
+        result = conn.execute(field_query, params).fetchall()
         suggestions = [row[0] for row in result if row[0]]
         
         return {
@@ -906,7 +912,7 @@ async def get_autocomplete_suggestions(
         conn.close()
 
 @app.get("/api/search/statistics")
-async def get_search_statistics(
+def get_search_statistics(
     state: str = Query(..., description="State code"),
     year_month: str = Query(..., description="Year-month in YYYY-MM format")
 ):
@@ -924,17 +930,21 @@ async def get_search_statistics(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/explore/data-availability")
-async def explore_data_availability(
+def explore_data_availability(
     state: str = Query(..., description="State code"),
     year_month: str = Query(..., description="Year-month in YYYY-MM format"),
     category: str = Query(..., description="Category to explore (payer, organization, taxonomy, procedure_set, procedure_class)"),
     limit: int = Query(25, description="Number of results to return"),
-    offset: int = Query(0, description="Number of results to skip for pagination")
+    offset: int = Query(0, description="Number of results to skip for pagination"),
+    after_count: Optional[int] = Query(None, description="record_count of the previous page's last row (cursor pagination)"),
+    after_value: Optional[str] = Query(None, description="value of the previous page's last row (cursor pagination)")
 ):
     """Explore data availability by category to help users understand what data exists"""
     try:
         optimized_queries = get_optimized_queries()
-        results = optimized_queries.explore_data_availability(state, year_month, category, limit, offset)
+        cursor = (after_count, after_value) if after_count is not None and after_value is not None else None
+        results = optimized_queries.explore_data_availability(state, year_month, category, limit, offset, cursor)
+        has_more = len(results) == limit
         
         return {
             "state": state,
@@ -943,14 +953,18 @@ async def explore_data_availability(
             "limit": limit,
             "offset": offset,
             "result_count": len(results),
-            "has_more": len(results) == limit,  # Indicates if there are more results
+            "has_more": has_more,  # Indicates if there are more results
+            "next_cursor": (
+                {"after_count": results[-1]["record_count"], "after_value": results[-1]["value"]}
+                if has_more else None
+            ),
             "results": results
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/explore/category-stats")
-async def get_category_statistics(
+def get_category_statistics(
     state: str = Query(..., description="State code"),
     year_month: str = Query(..., description="Year-month in YYYY-MM format")
 ):
@@ -968,7 +982,7 @@ async def get_category_statistics(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/explore/drill-down")
-async def drill_down_exploration(
+def drill_down_exploration(
     state: str = Query(..., description="State code"),
     year_month: str = Query(..., description="Year-month in YYYY-MM format"),
     category: str = Query(..., description="Category to explore"),
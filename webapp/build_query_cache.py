@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Build the dashboard query cache ahead of time
+Builds the pre-joined search tables in a staging file and swaps it over
+prod_etl/core/data/cache/search_index.duckdb; running dashboard workers attach the
+new file on their next cache check
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add the webapp directory to the path
+webapp_dir = Path(__file__).parent
+sys.path.append(str(webapp_dir))
+
+from utils.optimized_queries import SEARCH_CACHE_DB, OptimizedMRFQueries
+
+def main():
+    """Build (or refresh) the search cache, then exit"""
+    parser = argparse.ArgumentParser(description="Build the MRF dashboard query cache")
+    parser.add_argument("--force", action="store_true",
+                        help="Rebuild even if the source parquet files are unchanged")
+    args = parser.parse_args()
+
+    print("🔧 Building MRF dashboard query cache...")
+    start_time = time.time()
+
+    queries = OptimizedMRFQueries()
+    rebuilt = queries.refresh(force=args.force)
+
+    elapsed = time.time() - start_time
+    if queries.last_build_catalog == "memory" or not queries.cache_attached:
+        print(f"❌ Query cache could not be written to {SEARCH_CACHE_DB}; tables were only built in memory")
+        sys.exit(1)
+    if rebuilt:
+        print(f"✅ Query cache built in {elapsed:.2f} seconds: {SEARCH_CACHE_DB}")
+    else:
+        print(f"✅ Query cache already up to date: {SEARCH_CACHE_DB}")
+    if not queries.fts_enabled:
+        print("⚠️  Cache has no full-text index (fts extension unavailable); text search will use ILIKE")
+
+if __name__ == "__main__":
+    main()
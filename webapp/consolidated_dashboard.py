@@ -5,9 +5,8 @@ Combines FastAPI backend and HTML frontend in one high-performance application
 """
 
 import asyncio
-import threading
-import time
 import webbrowser
+from contextlib import asynccontextmanager
 from pathlib import Path
 from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
@@ -27,6 +26,13 @@ sys.path.insert(0, str(webapp_dir))
 
 # Import simple queries to prevent crashes
 from simple_queries import get_simple_queries
+from utils.optimized_queries import get_optimized_queries
+from utils.server_utils import (
+    ORJSONResponse, bind_listen_socket, default_worker_count, run_in_background, serve_on_socket
+)
+
+DASHBOARD_PORT = 8080
+DASHBOARD_WORKERS = default_worker_count()
 
 # Data paths
 DATA_ROOT = webapp_dir.parent / "prod_etl/core/data"
@@ -41,11 +47,19 @@ DIM_POS_SET = DATA_ROOT / "dims/dim_pos_set.parquet"
 XREF_GROUP_NPI = DATA_ROOT / "xrefs/xref_pg_member_npi.parquet"
 XREF_GROUP_TIN = DATA_ROOT / "xrefs/xref_pg_member_tin.parquet"
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm parquet metadata in the background as each worker starts"""
+    run_in_background(get_simple_queries().warm_up)
+    yield
+
 # FastAPI app
 app = FastAPI(
     title="MRF Consolidated Dashboard",
     description="High-performance MRF data dashboard with integrated backend and frontend",
-    version="2.0.0"
+    version="2.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -71,6 +85,8 @@ def slugify(s: str) -> str:
 
 # =============================================================================
 # API ENDPOINTS - Optimized for Performance
+# Handlers that run DuckDB/Polars work are plain `def` so FastAPI runs them in
+# its threadpool instead of blocking the event loop
 # =============================================================================
 
 @app.get("/", response_class=HTMLResponse)
@@ -79,7 +95,7 @@ async def serve_dashboard():
     return FileResponse(webapp_dir / "frontend" / "optimized_dashboard.html")
 
 @app.get("/api/health")
-async def health_check():
+def health_check():
     """Health check endpoint"""
     try:
         files_status = {
@@ -115,7 +131,7 @@ async def health_check():
         return {"status": "error", "message": str(e)}
 
 @app.get("/api/search/multi-field")
-async def multi_field_search(
+def multi_field_search(
     state: str = Query(..., description="State code"),
     year_month: str = Query(..., description="Year-month in YYYY-MM format"),
     primary_taxonomy_desc: Optional[str] = Query(None, description="Primary taxonomy description filter"),
@@ -170,7 +186,7 @@ async def multi_field_search(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/autocomplete/{field}")
-async def get_autocomplete_suggestions(
+def get_autocomplete_suggestions(
     field: str,
     query: str = Query("", description="Search query"),
     state: str = Query(..., description="State code"),
@@ -193,17 +209,21 @@ async def get_autocomplete_suggestions(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/explore/data-availability")
-async def explore_data_availability(
+def explore_data_availability(
     state: str = Query(..., description="State code"),
     year_month: str = Query(..., description="Year-month in YYYY-MM format"),
     category: str = Query(..., description="Category to explore"),
     limit: int = Query(25, description="Number of results to return"),
-    offset: int = Query(0, description="Number of results to skip for pagination")
+    offset: int = Query(0, description="Number of results to skip for pagination"),
+    after_count: Optional[int] = Query(None, description="record_count of the previous page's last row (cursor pagination)"),
+    after_value: Optional[str] = Query(None, description="value of the previous page's last row (cursor pagination)")
 ):
     """Explore data availability by category"""
     try:
-        simple_queries = get_simple_queries()
-        results = optimized_queries.explore_data_availability(state, year_month, category, limit, offset)
+        optimized_queries = get_optimized_queries()
+        cursor = (after_count, after_value) if after_count is not None and after_value is not None else None
+        results = optimized_queries.explore_data_availability(state, year_month, category, limit, offset, cursor)
+        has_more = len(results) == limit
         
         return {
             "state": state,
@@ -212,20 +232,24 @@ async def explore_data_availability(
             "limit": limit,
             "offset": offset,
             "result_count": len(results),
-            "has_more": len(results) == limit,
+            "has_more": has_more,
+            "next_cursor": (
+                {"after_count": results[-1]["record_count"], "after_value": results[-1]["value"]}
+                if has_more else None
+            ),
             "results": results
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/explore/category-stats")
-async def get_category_statistics(
+def get_category_statistics(
     state: str = Query(..., description="State code"),
     year_month: str = Query(..., description="Year-month in YYYY-MM format")
 ):
     """Get high-level statistics for each category"""
     try:
-        simple_queries = get_simple_queries()
+        optimized_queries = get_optimized_queries()
         stats = optimized_queries.get_category_statistics(state, year_month)
         
         return {
@@ -237,7 +261,7 @@ async def get_category_statistics(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/explore/drill-down")
-async def drill_down_exploration(
+def drill_down_exploration(
     state: str = Query(..., description="State code"),
     year_month: str = Query(..., description="Year-month in YYYY-MM format"),
     category: str = Query(..., description="Category to explore"),
@@ -247,7 +271,7 @@ async def drill_down_exploration(
 ):
     """Drill down from one category to another"""
     try:
-        simple_queries = get_simple_queries()
+        optimized_queries = get_optimized_queries()
         results = optimized_queries.drill_down_exploration(
             state, year_month, category, selected_value, drill_category, limit
         )
@@ -268,15 +292,6 @@ async def drill_down_exploration(
 # MAIN APPLICATION
 # =============================================================================
 
-def open_browser_delayed(url: str, delay: float = 2.0):
-    """Open browser after a delay"""
-    def _open():
-        time.sleep(delay)
-        webbrowser.open(url)
-    
-    thread = threading.Thread(target=_open, daemon=True)
-    thread.start()
-
 def main():
     """Main function to start the consolidated dashboard"""
     print("🚀 Starting MRF Consolidated Dashboard...")
@@ -287,36 +302,30 @@ def main():
     print("⚡ Performance: Materialized views + indexing")
     print("=" * 60)
     
-    # Try different ports if 8080 is busy
-    ports_to_try = [8080, 8081, 8082, 8083, 8084]
+    host, port = "0.0.0.0", DASHBOARD_PORT
+    try:
+        sock = bind_listen_socket(host, port)
+    except OSError as e:
+        print(f"❌ Could not bind port {port}: {e}")
+        print(f"💡 Check for a running dashboard: netstat -ano | findstr :{port}")
+        return
+    
+    print(f"🌐 Starting server on port {port}...")
+    
+    # Requests queue on the listening socket until the server is up
+    run_in_background(webbrowser.open, f"http://localhost:{port}")
     
-    for port in ports_to_try:
-        try:
-            print(f"🌐 Starting server on port {port}...")
-            
-            # Open browser after a short delay
-            open_browser_delayed(f"http://localhost:{port}", 3.0)
-            
-            # Start the server
-            uvicorn.run(
-                app,
-                host="0.0.0.0",
-                port=port,
-                log_level="info",
-                access_log=False  # Disable access logs for better performance
-            )
-            break
-            
-        except OSError as e:
-            if "Address already in use" in str(e):
-                print(f"❌ Port {port} is busy, trying next port...")
-                continue
-            else:
-                print(f"❌ Error starting server: {e}")
-                break
-    else:
-        print("❌ Could not find an available port. Please check if any servers are running.")
-        print("💡 Try: netstat -ano | findstr :8080")
+    # Start the server on the pre-bound socket; uvicorn's "auto" loop/http pick
+    # uvloop and httptools when they are installed
+    serve_on_socket(
+        "consolidated_dashboard:app",
+        sock,
+        workers=DASHBOARD_WORKERS,
+        loop="auto",
+        http="auto",
+        log_level="info",
+        access_log=False  # Disable access logs for better performance
+    )
 
 if __name__ == "__main__":
     main()
@@ -3,6 +3,7 @@ Simple, memory-efficient queries for MRF dashboard
 Avoids complex joins and materialized views to prevent crashes
 """
 
+import threading
 import duckdb
 import polars as pl
 from pathlib import Path
@@ -12,20 +13,44 @@ import re
 # Data paths
 webapp_dir = Path(__file__).parent
 DATA_ROOT = webapp_dir.parent / "prod_etl/core/data"
+FACT_TABLE = DATA_ROOT / "gold/fact_rate.parquet"
+FACT_PARTITIONS = DATA_ROOT / "gold/fact_rate"
+# Hive-partitioned by state/year_month when the ETL has written it, so filters prune files
+FACT_SOURCE = (
+    f"read_parquet('{FACT_PARTITIONS}/**/*.parquet', hive_partitioning=1)"
+    if FACT_PARTITIONS.is_dir() else f"read_parquet('{FACT_TABLE}')"
+)
 
 class SimpleMRFQueries:
     """Simple, memory-efficient MRF data queries"""
     
     def __init__(self):
-        self.conn = duckdb.connect()
+        self._db = duckdb.connect()
         # Set very conservative memory limits
-        self.conn.execute("SET memory_limit='256MB'")
-        self.conn.execute("SET max_memory='256MB'")
-        self.conn.execute("SET threads=1")
+        self._db.execute("SET memory_limit='256MB'")
+        self._db.execute("SET max_memory='256MB'")
+        self._db.execute("SET threads=1")
+        # Keep parquet footers in memory once read, so only the first scan pays for them
+        self._db.execute("SET parquet_metadata_cache=true")
+        # Cursors are per thread: handlers and warm_up run on different threads
+        self._local = threading.local()
+    
+    @property
+    def conn(self) -> duckdb.DuckDBPyConnection:
+        """This thread's cursor on the instance's database; settings are shared by all"""
+        cursor = getattr(self._local, "cursor", None)
+        if cursor is None:
+            cursor = self._local.cursor = self._db.cursor()
+        return cursor
     
     def __del__(self):
-        if hasattr(self, 'conn'):
-            self.conn.close()
+        if hasattr(self, '_db'):
+            self._db.close()
+    
+    def warm_up(self):
+        """Read the fact table's parquet metadata up front so the first query isn't a cold start"""
+        if FACT_PARTITIONS.is_dir() or FACT_TABLE.exists():
+            self.conn.execute(f"SELECT COUNT(*) FROM {FACT_SOURCE}").fetchone()
     
     def multi_field_search(self, state: str, year_month: str,
                           billing_class: Optional[List[str]] = None,
@@ -64,30 +89,21 @@ class SimpleMRFQueries:
             SELECT 
                 code,
                 negotiated_rate,
-                reporting_entity_name,
+                reporting_entity_name as payer,
                 billing_class,
-                negotiated_type
-            FROM read_parquet('{DATA_ROOT / "gold/fact_rate.parquet"}')
+                negotiated_type,
+                'Provider Info' as organization_name,
+                'Medical Service' as taxonomy
+            FROM {FACT_SOURCE}
             WHERE {where_clause}
             ORDER BY negotiated_rate DESC
             LIMIT {limit}
             """
             
-            result = self.conn.execute(query, params).fetchall()
-            
-            # Convert to simple format
-            return [
-                {
-                    "code": row[0],
-                    "negotiated_rate": round(row[1], 2) if row[1] else 0,
-                    "payer": row[2],
-                    "billing_class": row[3],
-                    "negotiated_type": row[4],
-                    "organization_name": "Provider Info",
-                    "taxonomy": "Medical Service"
-                }
-                for row in result
-            ]
+            result = self.conn.execute(query, params).pl()
+            
+            # Round rates in one vectorized pass and convert column-wise
+            return result.with_columns(pl.col("negotiated_rate").cast(pl.Float64).round(2).fill_null(0)).to_dicts()
             
         except Exception as e:
             print(f"Error in simple multi_field_search: {e}")
@@ -129,16 +145,15 @@ class SimpleMRFQueries:
             
             # Simple query to get unique values
             query = f"""
-            SELECT {sql_field} as value, COUNT(*) as count
-            FROM read_parquet('{DATA_ROOT / "gold/fact_rate.parquet"}')
+            SELECT {sql_field} as value, {sql_field} as label, COUNT(*) as count
+            FROM {FACT_SOURCE}
             WHERE {where_clause} AND {sql_field} IS NOT NULL AND {sql_field} != ''
             GROUP BY {sql_field}
             ORDER BY count DESC
             LIMIT 20
             """
             
-            result = self.conn.execute(query, params).fetchall()
-            return [{"value": r[0], "label": r[0], "count": r[1]} for r in result]
+            return self.conn.execute(query, params).pl().to_dicts()
             
         except Exception as e:
             print(f"Error in get_stage_options for {stage_field}: {e}")
@@ -193,10 +208,14 @@ class SimpleMRFQueries:
 
 # Global instance
 _simple_queries = None
+_simple_queries_lock = threading.Lock()
 
 def get_simple_queries() -> SimpleMRFQueries:
     """Get singleton instance of simple queries"""
     global _simple_queries
     if _simple_queries is None:
-        _simple_queries = SimpleMRFQueries()
+        with _simple_queries_lock:
+            # Re-check under the lock so concurrent first requests build one instance
+            if _simple_queries is None:
+                _simple_queries = SimpleMRFQueries()
     return _simple_queries
@@ -5,14 +5,15 @@ Guides users through logical filtering steps to prevent over-filtering
 """
 
 import asyncio
-import threading
-import time
+import hashlib
 import webbrowser
+from contextlib import asynccontextmanager
 from pathlib import Path
 from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse, FileResponse, Response, StreamingResponse
 import uvicorn
 import duckdb
 import polars as pl
@@ -27,16 +28,73 @@ sys.path.insert(0, str(webapp_dir))
 
 # Import simple queries
 from simple_queries import get_simple_queries
+from utils.data_queries import get_mrf_queries
+from utils.server_utils import (
+    ORJSONResponse, bind_listen_socket, default_worker_count, run_in_background, serve_on_socket
+)
+
+DASHBOARD_PORT = 8080
+DASHBOARD_WORKERS = default_worker_count()
 
 # Data paths
 DATA_ROOT = webapp_dir.parent / "prod_etl/core/data"
 FACT_TABLE = DATA_ROOT / "gold/fact_rate.parquet"
 
+# Parquet sources registered once as views on each worker's connection
+APP_VIEWS = {
+    "fact": FACT_TABLE,
+    "dim_code_cat": DATA_ROOT / "dims/dim_code_cat.parquet",
+    "dim_npi": DATA_ROOT / "dims/dim_npi.parquet",
+    "xref_pg_member_npi": DATA_ROOT / "xrefs/xref_pg_member_npi.parquet",
+}
+
+# Created per worker in lifespan(), not at import - the supervisor and every
+# worker import this module, and only workers serve queries
+APP_CONN: Optional[duckdb.DuckDBPyConnection] = None
+
+def create_app_connection():
+    """Create the shared DuckDB connection with a view per parquet source"""
+    conn = duckdb.connect()
+    conn.execute("SET memory_limit='256MB'")
+    conn.execute("SET max_memory='256MB'")
+    # Keep parquet footers in memory once read, so only the first scan pays for them
+    conn.execute("SET parquet_metadata_cache=true")
+    for view_name, path in APP_VIEWS.items():
+        if not path.exists():
+            print(f"Warning: {path} not found, skipping view {view_name}")
+            continue
+        conn.execute(f"CREATE OR REPLACE VIEW {view_name} AS SELECT * FROM read_parquet('{path}')")
+    return conn
+
+def warm_app_connection():
+    """Read each view's parquet metadata up front so the first user query isn't a cold start"""
+    cursor = APP_CONN.cursor()
+    try:
+        for view_name, path in APP_VIEWS.items():
+            if path.exists():
+                cursor.execute(f"SELECT COUNT(*) FROM {view_name}").fetchone()
+    finally:
+        cursor.close()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open this worker's connection and warm parquet metadata in the background"""
+    global APP_CONN
+    APP_CONN = create_app_connection()
+    run_in_background(warm_app_connection)
+    try:
+        yield
+    finally:
+        APP_CONN.close()
+        APP_CONN = None
+
 # FastAPI app
 app = FastAPI(
     title="MRF Staged Dashboard",
     description="Step-by-step filtering process to prevent over-filtering",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -48,15 +106,41 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON payloads - result rows repeat long payer/org/taxonomy strings
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Mount static files
 app.mount("/static", StaticFiles(directory=webapp_dir / "frontend"), name="static")
 
-def get_duckdb_connection():
-    """Get DuckDB connection for queries"""
-    conn = duckdb.connect()
-    conn.execute("SET memory_limit='256MB'")
-    conn.execute("SET max_memory='256MB'")
-    return conn
+def run_query(query: str, params: Optional[List[Any]] = None) -> List[tuple]:
+    """Run a query on its own cursor of the shared app connection"""
+    cursor = APP_CONN.cursor()
+    try:
+        return cursor.execute(query, params or []).fetchall()
+    finally:
+        cursor.close()
+
+def run_frame_query(query: str, params: Optional[List[Any]] = None) -> pl.DataFrame:
+    """Like run_query, but returns the Arrow result as a Polars frame"""
+    cursor = APP_CONN.cursor()
+    try:
+        return cursor.execute(query, params or []).pl()
+    finally:
+        cursor.close()
+
+async def fetch_all(query: str, params: Optional[List[Any]] = None) -> List[tuple]:
+    """Run a query in a worker thread so DuckDB doesn't block the event loop"""
+    return await asyncio.to_thread(run_query, query, params)
+
+async def fetch_frame(query: str, params: Optional[List[Any]] = None) -> pl.DataFrame:
+    """Run a frame query in a worker thread so DuckDB doesn't block the event loop"""
+    return await asyncio.to_thread(run_frame_query, query, params)
+
+def compute_etag(request: Request) -> str:
+    """ETag for a GET request, derived from its query params and the fact table mtime"""
+    fact_mtime = FACT_TABLE.stat().st_mtime_ns if FACT_TABLE.exists() else 0
+    key = f"{sorted(request.query_params.multi_items())}|{fact_mtime}"
+    return '"' + hashlib.md5(key.encode()).hexdigest() + '"'
 
 # =============================================================================
 # STAGED FILTERING API ENDPOINTS
@@ -77,12 +161,10 @@ async def health_check():
         
         stats = {}
         if FACT_TABLE.exists():
-            conn = get_duckdb_connection()
-            result = conn.execute(f"SELECT COUNT(*) FROM read_parquet('{FACT_TABLE}')").fetchone()
+            result = await fetch_all("SELECT COUNT(*) FROM fact")
             stats = {
-                "total_records": result[0] if result else 0
+                "total_records": result[0][0] if result else 0
             }
-            conn.close()
         
         return {
             "status": "healthy",
@@ -99,16 +181,14 @@ async def get_billing_classes(
 ):
     """Stage 1: Get available billing classes"""
     try:
-        conn = get_duckdb_connection()
-        query = f"""
+        query = """
         SELECT DISTINCT billing_class, COUNT(*) as count
-        FROM read_parquet('{FACT_TABLE}')
+        FROM fact
         WHERE state = ? AND year_month = ? AND billing_class IS NOT NULL
         GROUP BY billing_class
         ORDER BY count DESC
         """
-        result = conn.execute(query, [state, year_month]).fetchall()
-        conn.close()
+        result = await fetch_all(query, [state, year_month])
         
         return {
             "stage": 1,
@@ -130,17 +210,15 @@ async def get_payers(
 ):
     """Stage 2: Get available payers for selected billing class"""
     try:
-        conn = get_duckdb_connection()
-        query = f"""
+        query = """
         SELECT DISTINCT reporting_entity_name, COUNT(*) as count
-        FROM read_parquet('{FACT_TABLE}')
+        FROM fact
         WHERE state = ? AND year_month = ? AND billing_class = ?
         GROUP BY reporting_entity_name
         ORDER BY count DESC
         LIMIT 20
         """
-        result = conn.execute(query, [state, year_month, billing_class]).fetchall()
-        conn.close()
+        result = await fetch_all(query, [state, year_month, billing_class])
         
         return {
             "stage": 2,
@@ -164,27 +242,25 @@ async def get_procedure_sets(
     """Stage 3: Get available procedure sets"""
     try:
         payer_list = [p.strip() for p in payers.split(',') if p.strip()]
-        placeholders = ','.join(['?' for _ in payer_list])
         
-        conn = get_duckdb_connection()
-        query = f"""
+        # The payer list binds as one LIST parameter, so every list length shares one plan
+        query = """
         SELECT DISTINCT 
             COALESCE(cc.proc_set, 'Unknown') as proc_set, 
             COUNT(*) as count
-        FROM read_parquet('{FACT_TABLE}') f
-        LEFT JOIN read_parquet('{DATA_ROOT / "dims/dim_code_cat.parquet"}') cc 
+        FROM fact f
+        LEFT JOIN dim_code_cat cc
             ON f.code = cc.proc_cd
         WHERE f.state = ? 
             AND f.year_month = ? 
             AND f.billing_class = ?
-            AND f.reporting_entity_name IN ({placeholders})
+            AND f.reporting_entity_name IN (SELECT unnest(?))
         GROUP BY COALESCE(cc.proc_set, 'Unknown')
         ORDER BY count DESC
         LIMIT 15
         """
-        params = [state, year_month, billing_class] + payer_list
-        result = conn.execute(query, params).fetchall()
-        conn.close()
+        params = [state, year_month, billing_class, payer_list]
+        result = await fetch_all(query, params)
         
         return {
             "stage": 3,
@@ -209,13 +285,12 @@ async def get_procedure_classes(
     """Stage 4: Get available procedure classes"""
     try:
         payer_list = [p.strip() for p in payers.split(',') if p.strip()]
-        placeholders = ','.join(['?' for _ in payer_list])
         
         where_conditions = [
             "f.state = ?", "f.year_month = ?", "f.billing_class = ?",
-            f"f.reporting_entity_name IN ({placeholders})"
+            "f.reporting_entity_name IN (SELECT unnest(?))"
         ]
-        params = [state, year_month, billing_class] + payer_list
+        params = [state, year_month, billing_class, payer_list]
         
         if proc_set and proc_set != "Unknown":
             where_conditions.append("cc.proc_set = ?")
@@ -223,21 +298,19 @@ async def get_procedure_classes(
         
         where_clause = " AND ".join(where_conditions)
         
-        conn = get_duckdb_connection()
         query = f"""
         SELECT DISTINCT 
             COALESCE(cc.proc_class, 'Unknown') as proc_class, 
             COUNT(*) as count
-        FROM read_parquet('{FACT_TABLE}') f
-        LEFT JOIN read_parquet('{DATA_ROOT / "dims/dim_code_cat.parquet"}') cc 
+        FROM fact f
+        LEFT JOIN dim_code_cat cc
             ON f.code = cc.proc_cd
         WHERE {where_clause}
         GROUP BY COALESCE(cc.proc_class, 'Unknown')
         ORDER BY count DESC
         LIMIT 15
         """
-        result = conn.execute(query, params).fetchall()
-        conn.close()
+        result = await fetch_all(query, params)
         
         return {
             "stage": 4,
@@ -263,13 +336,12 @@ async def get_taxonomies(
     """Stage 5: Get available taxonomy descriptions"""
     try:
         payer_list = [p.strip() for p in payers.split(',') if p.strip()]
-        placeholders = ','.join(['?' for _ in payer_list])
         
         where_conditions = [
             "f.state = ?", "f.year_month = ?", "f.billing_class = ?",
-            f"f.reporting_entity_name IN ({placeholders})"
+            "f.reporting_entity_name IN (SELECT unnest(?))"
         ]
-        params = [state, year_month, billing_class] + payer_list
+        params = [state, year_month, billing_class, payer_list]
         
         if proc_set and proc_set != "Unknown":
             where_conditions.append("cc.proc_set = ?")
@@ -280,17 +352,16 @@ async def get_taxonomies(
         
         where_clause = " AND ".join(where_conditions)
         
-        conn = get_duckdb_connection()
         query = f"""
         SELECT DISTINCT 
             n.primary_taxonomy_desc, 
             COUNT(*) as count
-        FROM read_parquet('{FACT_TABLE}') f
-        LEFT JOIN read_parquet('{DATA_ROOT / "xrefs/xref_pg_member_npi.parquet"}') xn 
+        FROM fact f
+        LEFT JOIN xref_pg_member_npi xn
             ON f.pg_uid = xn.pg_uid
-        LEFT JOIN read_parquet('{DATA_ROOT / "dims/dim_npi.parquet"}') n 
+        LEFT JOIN dim_npi n
             ON xn.npi = n.npi
-        LEFT JOIN read_parquet('{DATA_ROOT / "dims/dim_code_cat.parquet"}') cc 
+        LEFT JOIN dim_code_cat cc
             ON f.code = cc.proc_cd
         WHERE {where_clause}
             AND n.primary_taxonomy_desc IS NOT NULL
@@ -298,8 +369,7 @@ async def get_taxonomies(
         ORDER BY count DESC
         LIMIT 20
         """
-        result = conn.execute(query, params).fetchall()
-        conn.close()
+        result = await fetch_all(query, params)
         
         return {
             "stage": 5,
@@ -315,6 +385,8 @@ async def get_taxonomies(
 
 @app.get("/api/results")
 async def get_filtered_results(
+    request: Request,
+    response: Response,
     state: str = Query(..., description="State code"),
     year_month: str = Query(..., description="Year-month in YYYY-MM format"),
     billing_class: str = Query(..., description="Selected billing class"),
@@ -325,15 +397,19 @@ async def get_filtered_results(
     limit: int = Query(100, description="Number of results to return")
 ):
     """Get final filtered results"""
+    etag = compute_etag(request)
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    
     try:
         payer_list = [p.strip() for p in payers.split(',') if p.strip()]
-        payer_placeholders = ','.join(['?' for _ in payer_list])
         
         where_conditions = [
             "f.state = ?", "f.year_month = ?", "f.billing_class = ?",
-            f"f.reporting_entity_name IN ({payer_placeholders})"
+            "f.reporting_entity_name IN (SELECT unnest(?))"
         ]
-        params = [state, year_month, billing_class] + payer_list
+        params = [state, year_month, billing_class, payer_list]
         
         if proc_set and proc_set != "Unknown":
             where_conditions.append("cc.proc_set = ?")
@@ -343,13 +419,11 @@ async def get_filtered_results(
             params.append(proc_class)
         if taxonomies:
             taxonomy_list = [t.strip() for t in taxonomies.split(',') if t.strip()]
-            taxonomy_placeholders = ','.join(['?' for _ in taxonomy_list])
-            where_conditions.append(f"n.primary_taxonomy_desc IN ({taxonomy_placeholders})")
-            params.extend(taxonomy_list)
+            where_conditions.append("n.primary_taxonomy_desc IN (SELECT unnest(?))")
+            params.append(taxonomy_list)
         
         where_clause = " AND ".join(where_conditions)
         
-        conn = get_duckdb_connection()
         query = f"""
         SELECT 
             f.fact_uid,
@@ -357,63 +431,54 @@ async def get_filtered_results(
             f.code_type,
             f.negotiated_rate,
             f.billing_class,
-            f.reporting_entity_name,
+            f.reporting_entity_name as payer,
             n.npi,
             n.organization_name,
-            n.primary_taxonomy_desc,
+            n.primary_taxonomy_desc as taxonomy,
             cc.proc_set,
             cc.proc_class,
             cc.proc_group
-        FROM read_parquet('{FACT_TABLE}') f
-        LEFT JOIN read_parquet('{DATA_ROOT / "xrefs/xref_pg_member_npi.parquet"}') xn 
+        FROM fact f
+        LEFT JOIN xref_pg_member_npi xn
             ON f.pg_uid = xn.pg_uid
-        LEFT JOIN read_parquet('{DATA_ROOT / "dims/dim_npi.parquet"}') n 
+        LEFT JOIN dim_npi n
             ON xn.npi = n.npi
-        LEFT JOIN read_parquet('{DATA_ROOT / "dims/dim_code_cat.parquet"}') cc 
+        LEFT JOIN dim_code_cat cc
             ON f.code = cc.proc_cd
         WHERE {where_clause}
         ORDER BY f.negotiated_rate DESC
-        LIMIT {min(limit, 500)}
+        LIMIT ?
         """
-        result = conn.execute(query, params).fetchall()
-        conn.close()
+        params.append(min(limit, 500))
+        result = await fetch_frame(query, params)
+        # Round rates in one vectorized pass rather than per row
+        result = result.with_columns(pl.col("negotiated_rate").cast(pl.Float64).round(2).fill_null(0))
         
         return {
-            "total_results": len(result),
-            "results": [
-                {
-                    "fact_uid": row[0],
-                    "code": row[1],
-                    "code_type": row[2],
-                    "negotiated_rate": round(row[3], 2) if row[3] else 0,
-                    "billing_class": row[4],
-                    "payer": row[5],
-                    "npi": row[6],
-                    "organization_name": row[7],
-                    "taxonomy": row[8],
-                    "proc_set": row[9],
-                    "proc_class": row[10],
-                    "proc_group": row[11]
-                }
-                for row in result
-            ]
+            "total_results": result.height,
+            "results": result.to_dicts()
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/rate-details/export")
+def export_rate_details(
+    state: str = Query(..., description="State code"),
+    year_month: str = Query(..., description="Year-month in YYYY-MM format"),
+    payer: Optional[str] = Query(None, description="Payer name filter"),
+    code: Optional[str] = Query(None, description="Billing code filter")
+):
+    """Stream every matching rate record as NDJSON without materializing the full result"""
+    def generate():
+        with get_mrf_queries() as queries:
+            yield from queries.iter_rate_details(state, year_month, payer, code)
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
 # =============================================================================
 # MAIN APPLICATION
 # =============================================================================
 
-def open_browser_delayed(url: str, delay: float = 2.0):
-    """Open browser after a delay"""
-    def _open():
-        time.sleep(delay)
-        webbrowser.open(url)
-    
-    thread = threading.Thread(target=_open, daemon=True)
-    thread.start()
-
 def main():
     """Main function to start the staged dashboard"""
     print("🚀 Starting MRF Staged Dashboard...")
@@ -424,35 +489,30 @@ def main():
     print("⚡ Memory Efficient")
     print("=" * 60)
     
-    # Try different ports if 8080 is busy
-    ports_to_try = [8080, 8081, 8082, 8083, 8084]
+    host, port = "0.0.0.0", DASHBOARD_PORT
+    try:
+        sock = bind_listen_socket(host, port)
+    except OSError as e:
+        print(f"❌ Could not bind port {port}: {e}")
+        print(f"💡 Check for a running dashboard: netstat -ano | findstr :{port}")
+        return
+    
+    print(f"🌐 Starting server on port {port}...")
+    
+    # Requests queue on the listening socket until the server is up
+    run_in_background(webbrowser.open, f"http://localhost:{port}")
     
-    for port in ports_to_try:
-        try:
-            print(f"🌐 Starting server on port {port}...")
-            
-            # Open browser after a short delay
-            open_browser_delayed(f"http://localhost:{port}", 3.0)
-            
-            # Start the server
-            uvicorn.run(
-                app,
-                host="0.0.0.0",
-                port=port,
-                log_level="info",
-                access_log=False
-            )
-            break
-            
-        except OSError as e:
-            if "Address already in use" in str(e):
-                print(f"❌ Port {port} is busy, trying next port...")
-                continue
-            else:
-                print(f"❌ Error starting server: {e}")
-                break
-    else:
-        print("❌ Could not find an available port. Please check if any servers are running.")
+    # Start the server on the pre-bound socket; uvicorn's "auto" loop/http pick
+    # uvloop and httptools when they are installed
+    serve_on_socket(
+        "staged_dashboard:app",
+        sock,
+        workers=DASHBOARD_WORKERS,
+        loop="auto",
+        http="auto",
+        log_level="info",
+        access_log=False
+    )
 
 if __name__ == "__main__":
     main()
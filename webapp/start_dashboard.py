@@ -4,10 +4,19 @@ MRF Dashboard Launcher - Single Terminal Solution
 Starts the consolidated dashboard with all optimizations
 """
 
+import signal
 import sys
 import subprocess
+import threading
 from pathlib import Path
 
+from utils.server_utils import wait_for_port
+
+DASHBOARD_HOST = "localhost"
+DASHBOARD_PORT = 8080
+# How often the launcher checks whether the dashboard process has exited
+POLL_INTERVAL = 0.5
+
 def main():
     """Main launcher function"""
     print("🚀 MRF Dashboard Launcher")
@@ -22,13 +31,38 @@ def main():
     # Get the webapp directory
     webapp_dir = Path(__file__).parent
     
+    # Set on SIGTERM so the supervise loop wakes immediately instead of blocking in wait()
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    
     # Start the consolidated dashboard
+    process = None
     try:
-        subprocess.run([
+        process = subprocess.Popen([
             sys.executable, 
             str(webapp_dir / "consolidated_dashboard.py")
         ], cwd=webapp_dir)
+        
+        # Report readiness as soon as the server accepts connections
+        if wait_for_port(DASHBOARD_HOST, DASHBOARD_PORT, timeout=60):
+            print(f"✅ Dashboard ready at http://{DASHBOARD_HOST}:{DASHBOARD_PORT}")
+        elif process.poll() is None:
+            print(f"⚠️  Dashboard not answering on port {DASHBOARD_PORT} yet, still waiting...")
+        
+        # Poll rather than block so a crashed dashboard is noticed within POLL_INTERVAL
+        while process.poll() is None:
+            if stop_event.wait(POLL_INTERVAL):
+                process.terminate()
+                process.wait()
+                print("\n🛑 Dashboard stopped")
+                return
+        
+        if process.returncode != 0:
+            print(f"❌ Dashboard exited with code {process.returncode}")
+            sys.exit(process.returncode)
     except KeyboardInterrupt:
+        if process is not None:
+            process.wait()
         print("\n🛑 Dashboard stopped by user")
     except Exception as e:
         print(f"❌ Error starting dashboard: {e}")
@@ -5,10 +5,12 @@ Verifies that all components work correctly
 """
 
 import requests
-import time
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from utils.server_utils import wait_for_port
+
 def test_dashboard():
     """Test the consolidated dashboard functionality"""
     print("🧪 Testing MRF Consolidated Dashboard...")
@@ -52,14 +54,25 @@ def test_dashboard():
         }
     ]
     
+    def fetch(url):
+        try:
+            return requests.get(url, timeout=test_timeout)
+        except Exception as e:
+            return e
+    
+    # Issue every request at once so the run takes the slowest latency, not the sum
+    with ThreadPoolExecutor(max_workers=len(tests)) as pool:
+        responses = list(pool.map(fetch, [test['url'] for test in tests]))
+    
     passed = 0
     failed = 0
     
-    for test in tests:
+    for test, response in zip(tests, responses):
         print(f"Testing {test['name']}...", end=" ")
         
         try:
-            response = requests.get(test['url'], timeout=test_timeout)
+            if isinstance(response, Exception):
+                raise response
             
             if response.status_code == test['expected_status']:
                 if test['check_data']:
@@ -101,8 +114,9 @@ def main():
     """Main test function"""
     print("🚀 MRF Dashboard Test Suite")
     print("Make sure the dashboard is running: python start_dashboard.py")
-    print("Waiting 5 seconds for dashboard to start...")
-    time.sleep(5)
+    print("Waiting for dashboard to start...")
+    if not wait_for_port("localhost", 8080, timeout=30):
+        print("⚠️  Dashboard is not accepting connections on port 8080")
     
     success = test_dashboard()
     
@@ -6,13 +6,20 @@ Helper functions for common data access patterns
 import polars as pl
 import duckdb
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+import atexit
+import functools
 import re
+import threading
+import weakref
+
+from utils.optimized_queries import SEARCH_CACHE_DB, _attach_fts_index
 
 # Data paths - go up one level from webapp directory
 webapp_dir = Path(__file__).parent.parent
 DATA_ROOT = webapp_dir.parent / "prod_etl/core/data"
 FACT_TABLE = DATA_ROOT / "gold/fact_rate.parquet"
+FACT_PARTITIONS = DATA_ROOT / "gold/fact_rate"
 DIM_CODE = DATA_ROOT / "dims/dim_code.parquet"
 DIM_CODE_CAT = DATA_ROOT / "dims/dim_code_cat.parquet"
 DIM_PAYER = DATA_ROOT / "dims/dim_payer.parquet"
@@ -23,57 +30,132 @@ DIM_POS_SET = DATA_ROOT / "dims/dim_pos_set.parquet"
 XREF_GROUP_NPI = DATA_ROOT / "xrefs/xref_pg_member_npi.parquet"
 XREF_GROUP_TIN = DATA_ROOT / "xrefs/xref_pg_member_tin.parquet"
 
+# Parquet sources exposed as views on the shared connection
+VIEWS = {
+    # Prefer the hive-partitioned layout so state/year_month filters skip whole files
+    "fact_rate": FACT_PARTITIONS if FACT_PARTITIONS.is_dir() else FACT_TABLE,
+    "dim_code": DIM_CODE,
+    "dim_npi": DIM_NPI,
+    "xref_pg_member_npi": XREF_GROUP_NPI,
+}
+
+# Process-wide connection so parquet metadata is read once, not per instance
+_CONN = None
+_CONN_LOCK = threading.Lock()
+# Set once _CONN serves provider search from the search cache's BM25 index
+_FTS_ENABLED = False
+
+_SLUG_RE = re.compile(r'[^a-z0-9]+')
+
+@functools.lru_cache(maxsize=4096)
 def slugify(s: str) -> str:
     """Convert string to URL-friendly slug"""
-    return re.sub(r'[^a-z0-9]+', '_', s.lower()).strip('_') if s else None
+    return _SLUG_RE.sub('_', s.lower()).strip('_') if s else None
+
+def _parquet_source(path: Path) -> str:
+    """read_parquet() over a single file, or over a hive-partitioned directory"""
+    if path.is_dir():
+        return f"read_parquet('{path}/**/*.parquet', hive_partitioning=1)"
+    return f"read_parquet('{path}')"
+
+def _get_shared_connection() -> duckdb.DuckDBPyConnection:
+    """Get the shared DuckDB connection, creating its views on first use"""
+    global _CONN
+    with _CONN_LOCK:
+        if _CONN is None:
+            conn = duckdb.connect(database=':memory:')
+            for view_name, path in VIEWS.items():
+                if not path.exists():
+                    print(f"Warning: {path} not found, skipping view {view_name}")
+                    continue
+                conn.execute(f"CREATE OR REPLACE VIEW {view_name} AS SELECT * FROM {_parquet_source(path)}")
+            if SEARCH_CACHE_DB.exists():
+                _attach_npi_fts_index(conn)
+            _CONN = conn
+            atexit.register(conn.close)
+    return _CONN
+
+def _attach_npi_fts_index(conn: duckdb.DuckDBPyConnection) -> bool:
+    """Serve provider search from the dim_npi BM25 index that build_query_cache.py stores
+    
+    The file is attached once per process, so a later rebuild is picked up on restart.
+    """
+    global _FTS_ENABLED
+    try:
+        conn.execute(f"ATTACH '{SEARCH_CACHE_DB}' AS search_cache (READ_ONLY)")
+        _FTS_ENABLED = _attach_fts_index(conn, "search_cache", "dim_npi")
+    except Exception as e:
+        print(f"Full-text search unavailable, falling back to ILIKE: {e}")
+        _FTS_ENABLED = False
+    return _FTS_ENABLED
+
+# Rate columns rounded to cents before results leave the query layer
+RATE_COLUMNS = ("negotiated_rate", "avg_rate", "min_rate", "max_rate", "median_rate")
+
+def _round_rates(df: pl.DataFrame) -> pl.DataFrame:
+    """Round rate columns to 2dp in one vectorized pass, with nulls as 0
+    
+    Gold stores negotiated_rate as float32; widening first keeps float32 noise
+    (12.34 -> 12.34000015258789) out of the rounded values.
+    """
+    rate_cols = [c for c in RATE_COLUMNS if c in df.columns]
+    return df.with_columns(pl.col(rate_cols).cast(pl.Float64).round(2).fill_null(0)) if rate_cols else df
 
 class MRFDataQueries:
     """Main class for MRF data queries"""
     
     def __init__(self):
-        self.conn = duckdb.connect()
+        # Each instance gets its own cursor on the shared connection
+        self.conn = _get_shared_connection().cursor()
+        # Close the cursor when the instance is collected, without a __del__ finalizer
+        self._finalizer = weakref.finalize(self, self.conn.close)
+    
+    def close(self):
+        """Close this instance's cursor; safe to call more than once"""
+        self._finalizer()
     
-    def __del__(self):
-        if hasattr(self, 'conn'):
-            self.conn.close()
+    def __enter__(self) -> "MRFDataQueries":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def _fetch_dicts(self, query: str, params: Optional[List[Any]] = None) -> List[Dict[str, Any]]:
+        """Run a query and convert the Arrow result to dicts column-wise via Polars"""
+        return _round_rates(self.conn.execute(query, params or []).pl()).to_dicts()
     
     def get_available_data(self) -> Dict[str, Any]:
         """Get available states, year_months, and basic stats"""
-        query = f"""
+        # Availability stats and the payer list in one round trip; the payer branch is a
+        # plain DISTINCT, so no aggregates are computed per payer. is_payer tells them apart
+        query = """
         SELECT 
+            false as is_payer,
             state,
             year_month,
+            NULL as reporting_entity_name,
             COUNT(*) as record_count,
             COUNT(DISTINCT reporting_entity_name) as unique_payers,
             COUNT(DISTINCT code) as unique_procedures
-        FROM read_parquet('{FACT_TABLE}')
+        FROM fact_rate
         GROUP BY state, year_month
-        ORDER BY state, year_month
+        UNION ALL
+        SELECT true, NULL, NULL, reporting_entity_name, NULL, NULL, NULL
+        FROM (SELECT DISTINCT reporting_entity_name FROM fact_rate)
         """
         
-        result = self.conn.execute(query).fetchall()
+        result = self.conn.execute(query).pl()
         
-        # Get unique payers
-        payers_query = f"""
-        SELECT DISTINCT reporting_entity_name
-        FROM read_parquet('{FACT_TABLE}')
-        ORDER BY reporting_entity_name
-        """
-        
-        payers_result = self.conn.execute(payers_query).fetchall()
+        availability = (
+            result.filter(~pl.col("is_payer"))
+            .select("state", "year_month", "record_count", "unique_payers", "unique_procedures")
+            .sort("state", "year_month")
+        )
+        payers = result.filter(pl.col("is_payer")).sort("reporting_entity_name", nulls_last=True)
         
         return {
-            "data_availability": [
-                {
-                    "state": row[0],
-                    "year_month": row[1],
-                    "record_count": row[2],
-                    "unique_payers": row[3],
-                    "unique_procedures": row[4]
-                }
-                for row in result
-            ],
-            "available_payers": [row[0] for row in payers_result]
+            "data_availability": availability.to_dicts(),
+            "available_payers": payers["reporting_entity_name"].to_list()
         }
     
     def get_rate_summary(self, state: str, year_month: str, 
@@ -82,14 +164,18 @@ class MRFDataQueries:
                         code: Optional[str] = None) -> Dict[str, Any]:
         """Get rate summary statistics"""
         
-        where_conditions = [f"state = '{state}'", f"year_month = '{year_month}'"]
+        where_conditions = ["state = ?", "year_month = ?"]
+        params = [state, year_month]
         
         if payer:
-            where_conditions.append(f"reporting_entity_name ILIKE '%{payer}%'")
+            where_conditions.append("reporting_entity_name ILIKE ?")
+            params.append(f"%{payer}%")
         if code_type:
-            where_conditions.append(f"code_type = '{code_type}'")
+            where_conditions.append("code_type = ?")
+            params.append(code_type)
         if code:
-            where_conditions.append(f"code = '{code}'")
+            where_conditions.append("code = ?")
+            params.append(code)
         
         where_clause = " AND ".join(where_conditions)
         
@@ -102,11 +188,11 @@ class MRFDataQueries:
             PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY negotiated_rate) as median_rate,
             COUNT(DISTINCT code) as unique_procedures,
             COUNT(DISTINCT reporting_entity_name) as unique_payers
-        FROM read_parquet('{FACT_TABLE}')
+        FROM fact_rate
         WHERE {where_clause}
         """
         
-        result = self.conn.execute(query).fetchone()
+        summary = self._fetch_dicts(query, params)[0]
         
         return {
             "state": state,
@@ -116,59 +202,40 @@ class MRFDataQueries:
                 "code_type": code_type,
                 "code": code
             },
-            "summary": {
-                "total_rates": result[0],
-                "avg_rate": round(result[1], 2) if result[1] else 0,
-                "min_rate": round(result[2], 2) if result[2] else 0,
-                "max_rate": round(result[3], 2) if result[3] else 0,
-                "median_rate": round(result[4], 2) if result[4] else 0,
-                "unique_procedures": result[5],
-                "unique_payers": result[6]
-            }
+            "summary": summary
         }
     
     def get_rates_by_payer(self, state: str, year_month: str, limit: int = 50) -> List[Dict[str, Any]]:
         """Get rate statistics grouped by payer"""
         
-        query = f"""
+        query = """
         SELECT 
-            reporting_entity_name,
+            reporting_entity_name as payer_name,
             COUNT(*) as rate_count,
             AVG(negotiated_rate) as avg_rate,
             MIN(negotiated_rate) as min_rate,
             MAX(negotiated_rate) as max_rate,
             PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY negotiated_rate) as median_rate,
             COUNT(DISTINCT code) as unique_procedures
-        FROM read_parquet('{FACT_TABLE}')
-        WHERE state = '{state}' AND year_month = '{year_month}'
+        FROM fact_rate
+        WHERE state = ? AND year_month = ?
         GROUP BY reporting_entity_name
         ORDER BY rate_count DESC
-        LIMIT {limit}
+        LIMIT ?
         """
         
-        result = self.conn.execute(query).fetchall()
-        
-        return [
-            {
-                "payer_name": row[0],
-                "rate_count": row[1],
-                "avg_rate": round(row[2], 2) if row[2] else 0,
-                "min_rate": round(row[3], 2) if row[3] else 0,
-                "max_rate": round(row[4], 2) if row[4] else 0,
-                "median_rate": round(row[5], 2) if row[5] else 0,
-                "unique_procedures": row[6]
-            }
-            for row in result
-        ]
+        return self._fetch_dicts(query, [state, year_month, limit])
     
     def get_rates_by_procedure(self, state: str, year_month: str, 
                               code_type: Optional[str] = None, 
                               limit: int = 50) -> List[Dict[str, Any]]:
         """Get rate statistics grouped by procedure code"""
         
-        where_clause = f"WHERE state = '{state}' AND year_month = '{year_month}'"
+        where_clause = "WHERE f.state = ? AND f.year_month = ?"
+        params = [state, year_month]
         if code_type:
-            where_clause += f" AND code_type = '{code_type}'"
+            where_clause += " AND f.code_type = ?"
+            params.append(code_type)
         
         query = f"""
         WITH rates_with_desc AS (
@@ -178,8 +245,8 @@ class MRFDataQueries:
                 f.negotiated_rate,
                 f.reporting_entity_name,
                 COALESCE(d.code_desc, f.code) as code_desc
-            FROM read_parquet('{FACT_TABLE}') f
-            LEFT JOIN read_parquet('{DIM_CODE}') d 
+            FROM fact_rate f
+            LEFT JOIN dim_code d 
                 ON d.code_type = f.code_type AND d.code = f.code
             {where_clause}
         )
@@ -196,44 +263,37 @@ class MRFDataQueries:
         FROM rates_with_desc
         GROUP BY code_type, code, code_desc
         ORDER BY rate_count DESC
-        LIMIT {limit}
+        LIMIT ?
         """
+        params.append(limit)
         
-        result = self.conn.execute(query).fetchall()
-        
-        return [
-            {
-                "code_type": row[0],
-                "code": row[1],
-                "code_desc": row[2],
-                "rate_count": row[3],
-                "avg_rate": round(row[4], 2) if row[4] else 0,
-                "min_rate": round(row[5], 2) if row[5] else 0,
-                "max_rate": round(row[6], 2) if row[6] else 0,
-                "median_rate": round(row[7], 2) if row[7] else 0,
-                "unique_payers": row[8]
-            }
-            for row in result
-        ]
+        return self._fetch_dicts(query, params)
     
-    def get_rate_details(self, state: str, year_month: str,
-                        payer: Optional[str] = None,
-                        code: Optional[str] = None,
-                        limit: int = 100) -> List[Dict[str, Any]]:
-        """Get detailed rate records with descriptions"""
+    def _rate_details_query(self, state: str, year_month: str,
+                            payer: Optional[str] = None,
+                            code: Optional[str] = None,
+                            limit: Optional[int] = None) -> Tuple[str, List[Any]]:
+        """Build the rate details query and its params; no LIMIT when limit is None"""
         
-        where_conditions = [f"state = '{state}'", f"year_month = '{year_month}'"]
+        where_conditions = ["f.state = ?", "f.year_month = ?"]
+        params = [state, year_month]
         
         if payer:
-            where_conditions.append(f"reporting_entity_name ILIKE '%{payer}%'")
+            where_conditions.append("f.reporting_entity_name ILIKE ?")
+            params.append(f"%{payer}%")
         if code:
-            where_conditions.append(f"code = '{code}'")
+            where_conditions.append("f.code = ?")
+            params.append(code)
         
         where_clause = " AND ".join(where_conditions)
+        limit_clause = ""
+        if limit is not None:
+            limit_clause = "LIMIT ?"
+            params.append(limit)
         
         query = f"""
         SELECT 
-            f.reporting_entity_name,
+            f.reporting_entity_name as payer_name,
             f.code_type,
             f.code,
             COALESCE(d.code_desc, f.code) as code_desc,
@@ -241,78 +301,105 @@ class MRFDataQueries:
             f.negotiated_type,
             f.negotiation_arrangement,
             f.expiration_date
-        FROM read_parquet('{FACT_TABLE}') f
-        LEFT JOIN read_parquet('{DIM_CODE}') d 
+        FROM fact_rate f
+        LEFT JOIN dim_code d 
             ON d.code_type = f.code_type AND d.code = f.code
         WHERE {where_clause}
         ORDER BY f.reporting_entity_name, f.code, f.negotiated_rate
-        LIMIT {limit}
+        {limit_clause}
         """
         
-        result = self.conn.execute(query).fetchall()
+        return query, params
+    
+    def get_rate_details(self, state: str, year_month: str,
+                        payer: Optional[str] = None,
+                        code: Optional[str] = None,
+                        limit: int = 100) -> List[Dict[str, Any]]:
+        """Get detailed rate records with descriptions"""
+        
+        query, params = self._rate_details_query(state, year_month, payer, code, limit)
+        return self._fetch_dicts(query, params)
+    
+    def iter_rate_details(self, state: str, year_month: str,
+                          payer: Optional[str] = None,
+                          code: Optional[str] = None,
+                          batch_size: int = 8192) -> Iterator[str]:
+        """Yield all matching rate records as NDJSON, one Arrow batch at a time"""
         
-        return [
-            {
-                "payer_name": row[0],
-                "code_type": row[1],
-                "code": row[2],
-                "code_desc": row[3],
-                "negotiated_rate": round(row[4], 2) if row[4] else 0,
-                "negotiated_type": row[5],
-                "negotiation_arrangement": row[6],
-                "expiration_date": row[7]
-            }
-            for row in result
-        ]
+        query, params = self._rate_details_query(state, year_month, payer, code)
+        reader = self.conn.execute(query, params).fetch_record_batch(batch_size)
+        for batch in reader:
+            yield _round_rates(pl.from_arrow(batch)).write_ndjson()
     
     def search_providers(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
         """Search providers by name"""
         
-        search_query = f"""
-        SELECT 
+        columns = """
             npi,
             organization_name,
             first_name,
             last_name,
             enumeration_type,
             primary_taxonomy_desc,
-            status
-        FROM read_parquet('{DIM_NPI}')
-        WHERE organization_name ILIKE '%{query}%' 
-           OR first_name ILIKE '%{query}%' 
-           OR last_name ILIKE '%{query}%'
+            status"""
+        
+        if _FTS_ENABLED:
+            # Posting-list lookup on the BM25 index, best matches first
+            search_query = f"""
+            SELECT {columns}
+            FROM (
+                SELECT {columns}, fts_main_dim_npi.match_bm25(
+                    npi, ?, fields := 'organization_name,first_name,last_name'
+                ) AS score
+                FROM dim_npi
+            )
+            WHERE score IS NOT NULL
+            ORDER BY score DESC
+            LIMIT ?
+            """
+            return self._fetch_dicts(search_query, [query, limit])
+        
+        search_query = f"""
+        SELECT {columns}
+        FROM dim_npi
+        WHERE organization_name ILIKE ? 
+           OR first_name ILIKE ? 
+           OR last_name ILIKE ?
         ORDER BY organization_name, last_name, first_name
-        LIMIT {limit}
+        LIMIT ?
         """
         
-        result = self.conn.execute(search_query).fetchall()
-        
-        return [
-            {
-                "npi": row[0],
-                "organization_name": row[1],
-                "first_name": row[2],
-                "last_name": row[3],
-                "enumeration_type": row[4],
-                "primary_taxonomy_desc": row[5],
-                "status": row[6]
-            }
-            for row in result
-        ]
+        pattern = f"%{query}%"
+        return self._fetch_dicts(search_query, [pattern, pattern, pattern, limit])
     
     def get_provider_rates(self, npi: str, state: str, year_month: str) -> List[Dict[str, Any]]:
         """Get rates for a specific provider"""
         
-        query = f"""
+        query = """
         WITH provider_rates AS (
+            -- Only the columns used below, so parquet reads skip the rest
             SELECT 
-                f.*,
-                regexp_replace(lower(f.reporting_entity_name), '[^a-z0-9]+', '_') as payer_slug
-            FROM read_parquet('{FACT_TABLE}') f
-            WHERE f.state = '{state}' AND f.year_month = '{year_month}'
+                f.reporting_entity_name,
+                f.code_type,
+                f.code,
+                f.negotiated_rate,
+                f.negotiated_type,
+                f.negotiation_arrangement,
+                f.expiration_date,
+                f.year_month,
+                f.pg_uid
+            FROM fact_rate f
+            WHERE f.state = ? AND f.year_month = ?
+        ),
+        -- Slug each payer name once rather than once per fact row
+        payer_slugs AS (
+            SELECT DISTINCT
+                reporting_entity_name,
+                regexp_replace(lower(reporting_entity_name), '[^a-z0-9]+', '_') as payer_slug
+            FROM provider_rates
         )
         SELECT 
-            pr.reporting_entity_name,
+            pr.reporting_entity_name as payer_name,
             pr.code_type,
             pr.code,
             COALESCE(d.code_desc, pr.code) as code_desc,
@@ -321,33 +408,24 @@ class MRFDataQueries:
             pr.negotiation_arrangement,
             pr.expiration_date
         FROM provider_rates pr
-        LEFT JOIN read_parquet('{DIM_CODE}') d 
+        JOIN payer_slugs ps 
+            ON ps.reporting_entity_name = pr.reporting_entity_name
+        LEFT JOIN dim_code d 
             ON d.code_type = pr.code_type AND d.code = pr.code
-        JOIN read_parquet('{XREF_GROUP_NPI}') x 
+        JOIN xref_pg_member_npi x 
             ON x.year_month = pr.year_month 
-            AND x.payer_slug = pr.payer_slug 
+            AND x.payer_slug = ps.payer_slug 
             AND x.pg_uid = pr.pg_uid
-        WHERE x.npi = '{npi}'
+        WHERE x.npi = ?
         ORDER BY pr.reporting_entity_name, pr.code
         """
         
-        result = self.conn.execute(query).fetchall()
-        
-        return [
-            {
-                "payer_name": row[0],
-                "code_type": row[1],
-                "code": row[2],
-                "code_desc": row[3],
-                "negotiated_rate": round(row[4], 2) if row[4] else 0,
-                "negotiated_type": row[5],
-                "negotiation_arrangement": row[6],
-                "expiration_date": row[7]
-            }
-            for row in result
-        ]
+        return self._fetch_dicts(query, [state, year_month, npi])
 
 # Convenience function for quick access
 def get_mrf_queries() -> MRFDataQueries:
-    """Get a new MRFDataQueries instance"""
+    """Get a new MRFDataQueries instance backed by the shared connection
+    
+    Use as a context manager (`with get_mrf_queries() as q:`) to close its cursor promptly.
+    """
     return MRFDataQueries()
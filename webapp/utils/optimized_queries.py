@@ -3,34 +3,262 @@ Optimized Query Engine for MRF Dashboard
 High-performance indexed queries using DuckDB materialized views
 """
 
+import atexit
+import copy
+import functools
+import os
+import threading
+import time
 import duckdb
 import polars as pl
+from collections import OrderedDict
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 import re
 from datetime import datetime
 import json
 
+from utils.server_utils import default_worker_count
+
 # Data paths
 webapp_dir = Path(__file__).parent.parent
 DATA_ROOT = webapp_dir.parent / "prod_etl/core/data"
+FACT_TABLE = DATA_ROOT / "gold/fact_rate.parquet"
+# Hive layout written by the ETL: fact_rate/state=XX/year_month=YYYY-MM/*.parquet
+FACT_PARTITIONS = DATA_ROOT / "gold/fact_rate"
+# Prefer the partitioned layout so state/year_month filters skip whole files
+FACT_SOURCE = FACT_PARTITIONS if FACT_PARTITIONS.is_dir() else FACT_TABLE
+# On-disk DuckDB file holding pre-joined search tables between processes
+SEARCH_CACHE_DB = DATA_ROOT / "cache/search_index.duckdb"
+# refresh() builds here, then swaps the finished file over SEARCH_CACHE_DB
+SEARCH_CACHE_BUILD_DB = DATA_ROOT / "cache/search_index.building.duckdb"
+# How often dashboard workers check whether the cache file has been replaced
+CACHE_WATCH_SECONDS = 5
+
+# Parquet sources joined into comprehensive_search_index; their mtimes decide when to rebuild
+COMPREHENSIVE_SOURCES = {
+    "f": FACT_SOURCE,
+    "xn": DATA_ROOT / "xrefs/xref_pg_member_npi.parquet",
+    "n": DATA_ROOT / "dims/dim_npi.parquet",
+    "xt": DATA_ROOT / "xrefs/xref_pg_member_tin.parquet",
+    "cc": DATA_ROOT / "dims/dim_code_cat.parquet",
+    "na": DATA_ROOT / "dims/dim_npi_address.parquet",
+}
+
+# Tables refresh() builds into the search cache; the runtime only reads them
+CACHED_TABLES = (
+    "comprehensive_search_index", "dim_autocomplete", "payer_search_index",
+    "provider_rate_agg", "tin_rate_agg", "code_rate_agg", "category_stats", "category_agg",
+    "drilldown_agg",
+)
+
+# Bump whenever a cached table's columns or contents change; caches built with another
+# version are not attached, and refresh() rebuilds them
+CACHE_SCHEMA_VERSION = 2
+
+# Tables refresh() stores with a BM25 index alongside CACHED_TABLES, when fts is available
+FTS_TABLES = ("dim_npi", "comprehensive_search_text")
+
+# Explore categories and the comprehensive_search_index column each one groups by
+EXPLORE_FIELDS = {
+    "payer": "reporting_entity_name",
+    "organization": "organization_name",
+    "taxonomy": "primary_taxonomy_desc",
+    "procedure_set": "proc_set",
+    "procedure_class": "proc_class",
+}
+# Drill-down categories: the explore categories plus codes, providers and TINs
+DRILLDOWN_FIELDS = {
+    **EXPLORE_FIELDS,
+    "procedure": "code",
+    "provider": "npi",
+    "tin": "tin_value",
+}
+# (source, drill) pairs precomputed into drilldown_agg; other pairs aggregate live
+DRILLDOWN_PAIRS = (
+    ("payer", "procedure"), ("payer", "organization"), ("payer", "taxonomy"),
+    ("organization", "payer"), ("organization", "procedure"), ("organization", "taxonomy"),
+    ("taxonomy", "payer"), ("taxonomy", "procedure"),
+    ("procedure_set", "procedure"), ("procedure_class", "procedure"),
+)
+# Distinct-count columns behind get_category_statistics
+CATEGORY_STATS_SELECT = """
+    COUNT(DISTINCT reporting_entity_name) as unique_payers,
+    COUNT(DISTINCT organization_name) as unique_organizations,
+    COUNT(DISTINCT primary_taxonomy_desc) as unique_taxonomies,
+    COUNT(DISTINCT proc_set) as unique_procedure_sets,
+    COUNT(DISTINCT proc_class) as unique_procedure_classes,
+    COUNT(DISTINCT code) as unique_procedures,
+    COUNT(DISTINCT npi) as unique_providers,
+    COUNT(DISTINCT tin_value) as unique_tins,
+    COUNT(*) as total_records
+"""
+# get_category_statistics entries: category -> (count column, static label/description)
+CATEGORY_STATS_META = {
+    "payer": ("unique_payers", {"label": "Payers", "description": "Insurance companies and payers"}),
+    "organization": ("unique_organizations", {"label": "Organizations", "description": "Healthcare organizations and provider groups"}),
+    "taxonomy": ("unique_taxonomies", {"label": "Taxonomies", "description": "Provider specialties and classifications"}),
+    "procedure_set": ("unique_procedure_sets", {"label": "Procedure Sets", "description": "High-level procedure categories"}),
+    "procedure_class": ("unique_procedure_classes", {"label": "Procedure Classes", "description": "Detailed procedure classifications"}),
+    "procedure": ("unique_procedures", {"label": "Procedures", "description": "Individual procedure codes"}),
+    "provider": ("unique_providers", {"label": "Providers", "description": "Individual healthcare providers"}),
+    "tin": ("unique_tins", {"label": "TINs", "description": "Tax identification numbers"}),
+}
+
+# comprehensive_search_index columns whose distinct values back autocomplete
+AUTOCOMPLETE_FIELDS = (
+    "organization_name", "primary_taxonomy_desc", "npi", "billing_class", "proc_set",
+    "proc_class", "proc_group", "code", "tin_value", "reporting_entity_name",
+)
+
+# DuckDB threads per process. Every dashboard worker opens its own connection, so the default
+# splits the cores between workers to stay within the memory budget; MRF_DUCKDB_THREADS overrides
+DUCKDB_THREADS = int(os.environ.get("MRF_DUCKDB_THREADS") or 0) or max(
+    1, (os.cpu_count() or 1) // default_worker_count()
+)
+
+# Process-wide connection; every thread queries it through its own cursor
+_CONN = None
+_CONN_LOCK = threading.Lock()
+
+def _get_shared_connection() -> duckdb.DuckDBPyConnection:
+    """Get the shared DuckDB connection, creating it on first use"""
+    global _CONN
+    with _CONN_LOCK:
+        if _CONN is None:
+            # One database for the whole process, so the memory cap is global rather than
+            # per instance
+            conn = duckdb.connect(database=':memory:', config={
+                "memory_limit": "512MB",
+                "threads": DUCKDB_THREADS,
+            })
+            # Multi-field search and the lazy search views still read parquet per query
+            conn.execute("SET parquet_metadata_cache=true")
+            _CONN = conn
+            atexit.register(conn.close)
+    return _CONN
+
+# Explore/statistics results kept per instance until the search cache is rebuilt
+RESULT_CACHE_SIZE = 1024
+
+def _cached_result(method):
+    """Memoize a query method on its arguments, least recently used entries evicted first"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        with self._results_lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                # Callers get their own copy, so changes to it never leak into later hits
+                return copy.deepcopy(self._results[key])
+        result = method(self, *args, **kwargs)
+        with self._results_lock:
+            self._results[key] = result
+            if len(self._results) > RESULT_CACHE_SIZE:
+                self._results.popitem(last=False)
+        return copy.deepcopy(result)
+    return wrapper
+
+# Rate columns rounded to cents before results leave the query layer
+RATE_COLUMNS = ("negotiated_rate", "avg_rate", "min_rate", "max_rate")
+
+def _parquet_source(path: Path) -> str:
+    """read_parquet() over a single file, or over a hive-partitioned directory"""
+    if path.is_dir():
+        return f"read_parquet('{path}/**/*.parquet', hive_partitioning=1)"
+    return f"read_parquet('{path}')"
+
+def _source_mtime(path: Path) -> int:
+    """Newest modification time of a parquet file, or of any file in a partitioned directory"""
+    if path.is_dir():
+        return max((p.stat().st_mtime_ns for p in path.glob("**/*.parquet")), default=0)
+    return path.stat().st_mtime_ns
+
+def _load_fts(conn: duckdb.DuckDBPyConnection) -> bool:
+    """Load the fts extension, installing it only if it isn't already available"""
+    
+    installed, loaded = conn.execute(
+        "SELECT installed, loaded FROM duckdb_extensions() WHERE extension_name = 'fts'"
+    ).fetchone() or (False, False)
+    if loaded:
+        return True
+    if not installed:
+        conn.execute("INSTALL fts")
+    conn.execute("LOAD fts")
+    return True
+
+def _attach_fts_index(conn: duckdb.DuckDBPyConnection, catalog: str, table: str) -> bool:
+    """Expose the BM25 index stored with `table` in an attached `catalog`; False if it has none
+    
+    The fts macros refer to their index tables as fts_main_<table>.<name>, resolved in the
+    caller's default catalog, so views and forwarding macros there point them at `catalog`.
+    """
+    
+    schema = f"fts_main_{table}"
+    index_tables = conn.execute(
+        "SELECT table_name FROM duckdb_tables() WHERE database_name = ? AND schema_name = ?",
+        [catalog, schema]
+    ).pl()["table_name"].to_list()
+    if not index_tables:
+        return False
+    # Only now, so a cache without indexes never triggers an INSTALL attempt
+    _load_fts(conn)
+    conn.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
+    for name in index_tables:
+        conn.execute(f"CREATE OR REPLACE VIEW {schema}.{name} AS SELECT * FROM {catalog}.{schema}.{name}")
+    conn.execute(f"CREATE OR REPLACE MACRO {schema}.tokenize(s) AS {catalog}.{schema}.tokenize(s)")
+    conn.execute(f"""
+    CREATE OR REPLACE MACRO {schema}.match_bm25(docname, query_string, fields := NULL) AS
+    {catalog}.{schema}.match_bm25(docname, query_string, fields := fields)
+    """)
+    conn.execute(f"CREATE OR REPLACE VIEW {table} AS SELECT * FROM {catalog}.main.{table}")
+    return True
+
+def _round_rates(df: pl.DataFrame) -> pl.DataFrame:
+    """Round rate columns to 2dp in one vectorized pass, with nulls as 0
+    
+    Gold stores negotiated_rate as float32; widening first keeps float32 noise
+    (12.34 -> 12.34000015258789) out of the rounded values.
+    """
+    rate_cols = [c for c in RATE_COLUMNS if c in df.columns]
+    return df.with_columns(pl.col(rate_cols).cast(pl.Float64).round(2).fill_null(0)) if rate_cols else df
 
 class OptimizedMRFQueries:
     """High-performance MRF data queries with materialized views and indexing"""
     
     def __init__(self):
-        self.conn = duckdb.connect()
-        # Set conservative memory limits to prevent crashes
-        self.conn.execute("SET memory_limit='512MB'")
-        self.conn.execute("SET max_memory='512MB'")
-        self.conn.execute("SET threads=2")  # Limit threads to reduce memory usage
+        # Cursors are per thread: FastAPI runs sync handlers on a threadpool
+        self._local = threading.local()
+        # Cached results of the @_cached_result methods; cleared whenever the tables change
+        self._results = OrderedDict()
+        self._results_lock = threading.Lock()
+        # Set when the attached cache (or an in-memory build) carries the BM25 indexes
+        self.fts_enabled = False
+        self.search_text_fts_enabled = False
+        # Set once refresh() has built dim_autocomplete
+        self.autocomplete_ready = False
+        # Provider-group join column; refresh() switches to the ETL's integer pg_id when present
+        self.pg_key = "pg_uid"
+        # Read-only cache attachments, newest last; each swapped-in file gets a new catalog name
+        self._cache_catalogs: List[str] = []
+        self._cache_file_stamp = None
+        self._cache_generation = 0
+        self._cache_lock = threading.Lock()
+        # Catalog the last refresh() rebuild wrote to: "search_cache_build", or "memory" if the
+        # cache file couldn't be written
+        self.last_build_catalog: Optional[str] = None
         # Skip materialized views for now to prevent memory issues
         # self._create_materialized_views()
-        # self._create_indexes()
+        # Search tables come prebuilt from build_query_cache.py when it has been run
+        self.attach_query_cache()
     
-    def __del__(self):
-        if hasattr(self, 'conn'):
-            self.conn.close()
+    @property
+    def conn(self) -> duckdb.DuckDBPyConnection:
+        """This thread's cursor on the shared connection; views and tables are shared by all"""
+        cursor = getattr(self._local, "cursor", None)
+        if cursor is None:
+            cursor = self._local.cursor = _get_shared_connection().cursor()
+        return cursor
     
     def _create_materialized_views(self):
         """Create materialized views for fast lookups"""
@@ -39,7 +267,7 @@ class OptimizedMRFQueries:
             # Check if data files exist before creating views
             npi_file = DATA_ROOT / "dims/dim_npi.parquet"
             npi_addr_file = DATA_ROOT / "dims/dim_npi_address.parquet"
-            fact_file = DATA_ROOT / "gold/fact_rate.parquet"
+            fact_file = FACT_SOURCE
             
             if not npi_file.exists():
                 print(f"Warning: {npi_file} not found, skipping materialized view creation")
@@ -109,7 +337,7 @@ class OptimizedMRFQueries:
                 ON xt.pg_uid = xn.pg_uid
             JOIN read_parquet('""" + str(DATA_ROOT / "dims/dim_npi.parquet") + """') n 
                 ON xn.npi = n.npi
-            JOIN read_parquet('""" + str(DATA_ROOT / "gold/fact_rate.parquet") + """') f 
+            JOIN """ + _parquet_source(FACT_SOURCE) + """ f 
                 ON xt.pg_uid = f.pg_uid
             """)
         except Exception as e:
@@ -130,6 +358,7 @@ class OptimizedMRFQueries:
             f.negotiated_type,
             f.negotiation_arrangement,
             f.pg_uid,
+            f.fact_uid,
             -- Procedure categorization
             cc.proc_set,
             cc.proc_class,
@@ -143,34 +372,438 @@ class OptimizedMRFQueries:
             )) as search_text,
             LOWER(TRIM(COALESCE(cc.proc_class, ''))) as proc_class_normalized,
             LOWER(TRIM(COALESCE(cc.proc_group, ''))) as proc_group_normalized
-        FROM read_parquet('""" + str(DATA_ROOT / "gold/fact_rate.parquet") + """') f
+        FROM """ + _parquet_source(FACT_SOURCE) + """ f
         LEFT JOIN read_parquet('""" + str(DATA_ROOT / "dims/dim_code_cat.parquet") + """') cc 
             ON f.code = cc.proc_cd
         """)
         
-        # Payer search index for fast payer lookups
-        self.conn.execute("""
-        CREATE OR REPLACE VIEW payer_search_index AS
+        # Comprehensive search and payer aggregates are tables, rebuilt only when sources change
+        self.refresh()
+    
+    def attach_query_cache(self) -> bool:
+        """Attach the prebuilt search cache read-only and expose its tables; False if it isn't built
+        
+        Cheap to call repeatedly: it only re-attaches after build_query_cache.py has swapped a
+        new file over SEARCH_CACHE_DB.
+        """
+        
+        try:
+            stat = SEARCH_CACHE_DB.stat()
+        except FileNotFoundError:
+            return False
+        file_stamp = (stat.st_ino, stat.st_mtime_ns)
+        
+        with self._cache_lock:
+            if file_stamp == self._cache_file_stamp:
+                return self.cache_attached
+            self._cache_file_stamp = file_stamp
+            self._cache_generation += 1
+            catalog = f"search_cache_{self._cache_generation}"
+            try:
+                # Read-only, so every dashboard worker process can attach the same file
+                self.conn.execute(f"ATTACH '{SEARCH_CACHE_DB}' AS {catalog} (READ_ONLY)")
+                built = self.conn.execute(
+                    "SELECT table_name FROM duckdb_tables() WHERE database_name = ?", [catalog]
+                ).pl()["table_name"]
+                if not all(table_name in built for table_name in CACHED_TABLES):
+                    self.conn.execute(f"DETACH {catalog}")
+                    return self.cache_attached
+                if self._cache_schema_version(catalog) != CACHE_SCHEMA_VERSION:
+                    print("Search cache was built by another version of this code, run build_query_cache.py")
+                    self.conn.execute(f"DETACH {catalog}")
+                    return self.cache_attached
+                self._create_cache_views(catalog)
+                self._attach_fts(catalog)
+            except Exception as e:
+                print(f"Search cache not attached, run build_query_cache.py: {e}")
+                return self.cache_attached
+            
+            # Queries started before the swap may still read the previous file, so keep it
+            # attached until the next swap and detach only the one before it
+            self._cache_catalogs.append(catalog)
+            while len(self._cache_catalogs) > 2:
+                self.conn.execute(f"DETACH {self._cache_catalogs.pop(0)}")
+        
+        self.pg_key = self._provider_group_key()
+        self.autocomplete_ready = True
+        self.clear_result_cache()
+        return True
+    
+    @property
+    def cache_attached(self) -> bool:
+        """Whether the search tables are being served from the on-disk cache file"""
+        return bool(self._cache_catalogs)
+    
+    def watch_query_cache(self, interval: float = CACHE_WATCH_SECONDS):
+        """Re-attach the search cache in the background whenever build_query_cache.py replaces it"""
+        def watch():
+            while True:
+                time.sleep(interval)
+                self.attach_query_cache()
+        threading.Thread(target=watch, name="query-cache-watch", daemon=True).start()
+    
+    def clear_result_cache(self):
+        """Drop cached explore/statistics results, e.g. after the search cache is rebuilt"""
+        with self._results_lock:
+            self._results.clear()
+    
+    def _create_cache_views(self, catalog: str):
+        """Point unqualified names at the cached tables so queries don't depend on the catalog"""
+        for table_name in CACHED_TABLES:
+            self.conn.execute(f"""
+            CREATE OR REPLACE VIEW {table_name} AS
+            SELECT * FROM {catalog}.main.{table_name}
+            """)
+    
+    def _attach_fts(self, catalog: str):
+        """Serve text search from the BM25 indexes in `catalog`, when it has them"""
+        
+        try:
+            self.fts_enabled = _attach_fts_index(self.conn, catalog, "dim_npi")
+            self.search_text_fts_enabled = _attach_fts_index(self.conn, catalog, "comprehensive_search_text")
+        except Exception as e:
+            print(f"Full-text search unavailable, falling back to ILIKE: {e}")
+            self.fts_enabled = self.search_text_fts_enabled = False
+    
+    def _attach_build_catalog(self) -> str:
+        """Attach a fresh staging file for a cache build, returning the catalog to build tables in"""
+        
+        try:
+            SEARCH_CACHE_DB.parent.mkdir(parents=True, exist_ok=True)
+            # Leftovers from an interrupted build
+            for leftover in (SEARCH_CACHE_BUILD_DB, Path(f"{SEARCH_CACHE_BUILD_DB}.wal")):
+                leftover.unlink(missing_ok=True)
+            self.conn.execute(f"ATTACH '{SEARCH_CACHE_BUILD_DB}' AS search_cache_build")
+            return "search_cache_build"
+        except Exception as e:
+            print(f"Search cache unavailable, building in memory: {e}")
+            return "memory"
+    
+    def _cache_schema_version(self, catalog: str) -> Optional[int]:
+        """CACHE_SCHEMA_VERSION that `catalog` was built with; None if it predates versioning"""
+        
+        try:
+            row = self.conn.execute(
+                f"SELECT schema_version FROM {catalog}.main.search_index_meta WHERE table_name = ?",
+                ["comprehensive_search_index"]
+            ).fetchone()
+        except duckdb.Error:
+            return None
+        return row[0] if row else None
+    
+    def _build_is_current(self, catalog: str, source_mtimes: str) -> bool:
+        """Whether `catalog` holds every cached table, built by this schema version from sources with these mtimes"""
+        
+        tables = self.conn.execute(
+            "SELECT table_name FROM duckdb_tables() WHERE database_name = ?", [catalog]
+        ).pl()["table_name"].to_list()
+        if "search_index_meta" not in tables or not all(t in tables for t in CACHED_TABLES):
+            return False
+        if self._cache_schema_version(catalog) != CACHE_SCHEMA_VERSION:
+            return False
+        stamp = self.conn.execute(
+            f"SELECT source_mtimes FROM {catalog}.main.search_index_meta WHERE table_name = ?",
+            ["comprehensive_search_index"]
+        ).fetchone()
+        return stamp is not None and stamp[0] == source_mtimes
+    
+    def refresh(self, force: bool = False) -> bool:
+        """Rebuild the search tables when a source parquet changed; returns True if rebuilt
+        
+        Tables are built in a staging file that then replaces SEARCH_CACHE_DB, so this works while
+        dashboard workers hold the current cache open; they pick up the new file on their next
+        attach_query_cache(). If the staging file can't be written the tables are built in memory
+        for this process only; last_build_catalog records which happened.
+        """
+        
+        self.attach_query_cache()
+        self.pg_key = self._provider_group_key()
+        source_mtimes = json.dumps(
+            {alias: _source_mtime(path) for alias, path in COMPREHENSIVE_SOURCES.items() if path.exists()},
+            sort_keys=True
+        )
+        
+        current = self._cache_catalogs[-1] if self.cache_attached else "memory"
+        if not force and self._build_is_current(current, source_mtimes):
+            self.autocomplete_ready = True
+            return False
+        
+        catalog = self.last_build_catalog = self._attach_build_catalog()
+        self.conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {catalog}.main.search_index_meta (
+            table_name VARCHAR PRIMARY KEY,
+            source_mtimes VARCHAR,
+            schema_version INTEGER
+        )
+        """)
+        if catalog == "memory":
+            # Views left over from an earlier cache attach would shadow the in-memory tables
+            for table_name in CACHED_TABLES + FTS_TABLES:
+                self.conn.execute(f"DROP VIEW IF EXISTS {table_name}")
+            for table_name in FTS_TABLES:
+                self.conn.execute(f"DROP SCHEMA IF EXISTS fts_main_{table_name} CASCADE")
+        # Scan the fact parquet once; every cached table below is built from this copy
+        self.conn.execute(f"""
+        CREATE OR REPLACE TEMP TABLE fact_rate_scan AS
+        SELECT * FROM {_parquet_source(FACT_SOURCE)}
+        """)
+        try:
+            self._build_cached_tables(catalog, "fact_rate_scan")
+        finally:
+            self.conn.execute("DROP TABLE IF EXISTS fact_rate_scan")
+        self.conn.execute(
+            f"INSERT OR REPLACE INTO {catalog}.main.search_index_meta VALUES (?, ?, ?)",
+            ["comprehensive_search_index", source_mtimes, CACHE_SCHEMA_VERSION]
+        )
+        
+        if catalog != "memory":
+            # Readers keep the old file open until they re-attach, so it can be replaced in place
+            self.conn.execute(f"CHECKPOINT {catalog}")
+            self.conn.execute(f"DETACH {catalog}")
+            with duckdb.connect(str(SEARCH_CACHE_BUILD_DB)) as build_conn:
+                self._build_fts_indexes(build_conn)
+            os.replace(SEARCH_CACHE_BUILD_DB, SEARCH_CACHE_DB)
+            self.attach_query_cache()
+        else:
+            built = self._build_fts_indexes(self.conn)
+            self.fts_enabled = "dim_npi" in built
+            self.search_text_fts_enabled = "comprehensive_search_text" in built
+        self.autocomplete_ready = True
+        self.clear_result_cache()
+        return True
+    
+    def _build_cached_tables(self, catalog: str, fact: str):
+        """Build every table in CACHED_TABLES, reading facts from the `fact` relation"""
+        
+        # Sorted by (state, year_month) so zone maps prune every state/month filter
+        self.conn.execute(f"""
+        CREATE OR REPLACE TABLE {catalog}.main.comprehensive_search_index AS
+        {self._comprehensive_search_select(fact)}
+        ORDER BY f.state, f.year_month
+        """)
+        self._build_autocomplete(catalog)
+        # One row per state/month, so get_category_statistics is a point lookup
+        self.conn.execute(f"""
+        CREATE OR REPLACE TABLE {catalog}.main.category_stats AS
+        SELECT state, year_month, {CATEGORY_STATS_SELECT}
+        FROM {catalog}.main.comprehensive_search_index
+        GROUP BY state, year_month
+        ORDER BY state, year_month
+        """)
+        self._build_category_agg(catalog)
+        self._build_drilldown_agg(catalog)
+        self._build_provider_rate_agg(catalog, fact)
+        self._build_tin_and_code_rate_aggs(catalog, fact)
+        # Payer aggregates are a few rows per payer/state/month; search_by_payer just filters them
+        self.conn.execute(f"""
+        CREATE OR REPLACE TABLE {catalog}.main.payer_search_index AS
         SELECT 
             f.payer_slug,
             f.reporting_entity_name,
             f.state,
             f.year_month,
             COUNT(*) as rate_count,
-            AVG(f.negotiated_rate) as avg_rate,
-            MIN(f.negotiated_rate) as min_rate,
-            MAX(f.negotiated_rate) as max_rate,
+            AVG(f.negotiated_rate::DOUBLE) as avg_rate,
+            MIN(f.negotiated_rate::DOUBLE) as min_rate,
+            MAX(f.negotiated_rate::DOUBLE) as max_rate,
             COUNT(DISTINCT f.code) as unique_procedures,
             COUNT(DISTINCT f.pg_uid) as unique_provider_groups,
             -- Pre-computed search fields
             LOWER(TRIM(f.reporting_entity_name)) as payer_name_normalized
-        FROM read_parquet('""" + str(DATA_ROOT / "gold/fact_rate.parquet") + """') f
+        FROM {fact} f
         GROUP BY f.payer_slug, f.reporting_entity_name, f.state, f.year_month
+        ORDER BY f.state, f.year_month
         """)
+    
+    def _build_category_agg(self, catalog: str):
+        """Per-value aggregates for each explore category, in explore page order"""
         
-        # Comprehensive search index combining all dimensions
-        self.conn.execute("""
-        CREATE OR REPLACE VIEW comprehensive_search_index AS
+        selects = " UNION ALL ".join(
+            f"""
+            SELECT 
+                state,
+                year_month,
+                '{category}' as category,
+                CAST({field} AS VARCHAR) as value,
+                COUNT(*) as record_count,
+                COUNT(DISTINCT npi) as unique_providers,
+                COUNT(DISTINCT code) as unique_procedures,
+                AVG(negotiated_rate::DOUBLE) as avg_rate,
+                MIN(negotiated_rate::DOUBLE) as min_rate,
+                MAX(negotiated_rate::DOUBLE) as max_rate
+            FROM {catalog}.main.comprehensive_search_index
+            WHERE {field} IS NOT NULL AND {field} != ''
+            GROUP BY state, year_month, {field}
+            """
+            for category, field in EXPLORE_FIELDS.items()
+        )
+        self.conn.execute(f"""
+        CREATE OR REPLACE TABLE {catalog}.main.category_agg AS
+        {selects}
+        ORDER BY state, year_month, category, record_count DESC, value DESC
+        """)
+    
+    def _build_drilldown_agg(self, catalog: str):
+        """Per-value aggregates for each DRILLDOWN_PAIRS source value, in drill-down page order"""
+        
+        selects = " UNION ALL ".join(
+            f"""
+            SELECT 
+                state,
+                year_month,
+                '{source}' as source_category,
+                CAST({DRILLDOWN_FIELDS[source]} AS VARCHAR) as source_value,
+                '{drill}' as drill_category,
+                CAST({DRILLDOWN_FIELDS[drill]} AS VARCHAR) as value,
+                COUNT(*) as record_count,
+                COUNT(DISTINCT npi) as unique_providers,
+                COUNT(DISTINCT code) as unique_procedures,
+                AVG(negotiated_rate::DOUBLE) as avg_rate,
+                MIN(negotiated_rate::DOUBLE) as min_rate,
+                MAX(negotiated_rate::DOUBLE) as max_rate
+            FROM {catalog}.main.comprehensive_search_index
+            WHERE {DRILLDOWN_FIELDS[source]} IS NOT NULL
+              AND {DRILLDOWN_FIELDS[drill]} IS NOT NULL 
+              AND {DRILLDOWN_FIELDS[drill]} != ''
+            GROUP BY state, year_month, {DRILLDOWN_FIELDS[source]}, {DRILLDOWN_FIELDS[drill]}
+            """
+            for source, drill in DRILLDOWN_PAIRS
+        )
+        self.conn.execute(f"""
+        CREATE OR REPLACE TABLE {catalog}.main.drilldown_agg AS
+        {selects}
+        ORDER BY state, year_month, source_category, drill_category, source_value, record_count DESC, value DESC
+        """)
+    
+    def _build_provider_rate_agg(self, catalog: str, fact: str):
+        """Per-provider rate aggregates, joined without the TIN and procedure-category fan-out"""
+        
+        src = {alias: _parquet_source(COMPREHENSIVE_SOURCES[alias]) for alias in ("xn", "n", "na")}
+        self.conn.execute(f"""
+        CREATE OR REPLACE TABLE {catalog}.main.provider_rate_agg AS
+        SELECT 
+            n.npi,
+            n.organization_name,
+            n.first_name,
+            n.last_name,
+            n.primary_taxonomy_desc,
+            n.status,
+            n.enumeration_type,
+            na.city,
+            na.state as provider_state,
+            na.postal_code,
+            f.state,
+            f.year_month,
+            COUNT(*) as rate_count,
+            AVG(f.negotiated_rate::DOUBLE) as avg_rate,
+            MIN(f.negotiated_rate::DOUBLE) as min_rate,
+            MAX(f.negotiated_rate::DOUBLE) as max_rate
+        FROM {fact} f
+        JOIN {src["xn"]} xn 
+            ON f.{self.pg_key} = xn.{self.pg_key}
+        JOIN {src["n"]} n 
+            ON xn.npi = n.npi
+        LEFT JOIN {src["na"]} na 
+            ON n.npi = na.npi AND na.address_purpose = 'LOCATION'
+        GROUP BY ALL
+        ORDER BY f.state, f.year_month
+        """)
+    
+    def _build_tin_and_code_rate_aggs(self, catalog: str, fact: str):
+        """Rate aggregates behind TIN, billing-code and procedure-category search"""
+        
+        src = {alias: _parquet_source(COMPREHENSIVE_SOURCES[alias]) for alias in ("xt", "xn", "n", "cc")}
+        self.conn.execute(f"""
+        CREATE OR REPLACE TABLE {catalog}.main.tin_rate_agg AS
+        SELECT 
+            f.state,
+            f.year_month,
+            xt.tin_value,
+            xt.tin_type,
+            n.npi,
+            n.organization_name,
+            n.first_name,
+            n.last_name,
+            n.primary_taxonomy_desc,
+            f.payer_slug,
+            f.reporting_entity_name,
+            COUNT(*) as rate_count,
+            AVG(f.negotiated_rate::DOUBLE) as avg_rate,
+            MIN(f.negotiated_rate::DOUBLE) as min_rate,
+            MAX(f.negotiated_rate::DOUBLE) as max_rate
+        FROM {src["xt"]} xt
+        JOIN {src["xn"]} xn 
+            ON xt.{self.pg_key} = xn.{self.pg_key}
+        JOIN {src["n"]} n 
+            ON xn.npi = n.npi
+        JOIN {fact} f 
+            ON xt.{self.pg_key} = f.{self.pg_key}
+        GROUP BY ALL
+        ORDER BY f.state, f.year_month
+        """)
+        # Kept per billing_class with summed rates and payer lists, so procedure-category
+        # search can roll rows up across billing classes without revisiting the facts
+        self.conn.execute(f"""
+        CREATE OR REPLACE TABLE {catalog}.main.code_rate_agg AS
+        SELECT 
+            f.state,
+            f.year_month,
+            f.code,
+            f.code_type,
+            cc.proc_set,
+            cc.proc_class,
+            cc.proc_group,
+            f.billing_class,
+            COUNT(*) as rate_count,
+            COUNT(f.negotiated_rate) as rated_count,
+            SUM(f.negotiated_rate::DOUBLE) as sum_rate,
+            MIN(f.negotiated_rate::DOUBLE) as min_rate,
+            MAX(f.negotiated_rate::DOUBLE) as max_rate,
+            list(DISTINCT f.payer_slug) FILTER (WHERE f.payer_slug IS NOT NULL) as payer_slugs
+        FROM {fact} f
+        LEFT JOIN {src["cc"]} cc 
+            ON f.code = cc.proc_cd
+        GROUP BY ALL
+        ORDER BY f.state, f.year_month
+        """)
+    
+    def _build_autocomplete(self, catalog: str):
+        """Precompute distinct values per autocomplete field, state and month"""
+        
+        selects = " UNION ALL ".join(
+            f"""
+            SELECT '{field}' as field, state, year_month,
+                   CAST({field} AS VARCHAR) as value, LOWER(CAST({field} AS VARCHAR)) as value_lower
+            FROM {catalog}.main.comprehensive_search_index
+            WHERE {field} IS NOT NULL AND CAST({field} AS VARCHAR) != ''
+            GROUP BY state, year_month, {field}
+            """
+            for field in AUTOCOMPLETE_FIELDS
+        )
+        # Sorted so each field/state/month is a contiguous run that zone maps prune to
+        self.conn.execute(f"""
+        CREATE OR REPLACE TABLE {catalog}.main.dim_autocomplete AS
+        {selects}
+        ORDER BY field, state, year_month, value
+        """)
+    
+    def _provider_group_key(self) -> str:
+        """pg_id if the fact and both xrefs carry the integer key, else the pg_uid string"""
+        
+        for alias in ("f", "xn", "xt"):
+            path = COMPREHENSIVE_SOURCES[alias]
+            if not path.exists():
+                return "pg_uid"
+            columns = self.conn.execute(f"DESCRIBE SELECT * FROM {_parquet_source(path)}").pl()["column_name"]
+            if "pg_id" not in columns:
+                return "pg_uid"
+        return "pg_id"
+    
+    def _comprehensive_search_select(self, fact: str) -> str:
+        """SELECT joining the `fact` relation to provider, TIN, procedure and address dimensions"""
+        
+        src = {alias: _parquet_source(path) for alias, path in COMPREHENSIVE_SOURCES.items()}
+        return f"""
         SELECT 
             f.fact_uid,
             f.state,
@@ -215,59 +848,109 @@ class OptimizedMRFQueries:
                 COALESCE(f.reporting_entity_name, ''),
                 COALESCE(xt.tin_value, '')
             )) as full_search_text
-        FROM read_parquet('""" + str(DATA_ROOT / "gold/fact_rate.parquet") + """') f
-        LEFT JOIN read_parquet('""" + str(DATA_ROOT / "xrefs/xref_pg_member_npi.parquet") + """') xn 
-            ON f.pg_uid = xn.pg_uid
-        LEFT JOIN read_parquet('""" + str(DATA_ROOT / "dims/dim_npi.parquet") + """') n 
+        FROM {fact} f
+        LEFT JOIN {src["xn"]} xn 
+            ON f.{self.pg_key} = xn.{self.pg_key}
+        LEFT JOIN {src["n"]} n 
             ON xn.npi = n.npi
-        LEFT JOIN read_parquet('""" + str(DATA_ROOT / "xrefs/xref_pg_member_tin.parquet") + """') xt 
-            ON f.pg_uid = xt.pg_uid
-        LEFT JOIN read_parquet('""" + str(DATA_ROOT / "dims/dim_code_cat.parquet") + """') cc 
+        LEFT JOIN {src["xt"]} xt 
+            ON f.{self.pg_key} = xt.{self.pg_key}
+        LEFT JOIN {src["cc"]} cc 
             ON f.code = cc.proc_cd
-        LEFT JOIN read_parquet('""" + str(DATA_ROOT / "dims/dim_npi_address.parquet") + """') na 
+        LEFT JOIN {src["na"]} na 
             ON n.npi = na.npi AND na.address_purpose = 'LOCATION'
-        """)
+        """
     
-    def _create_indexes(self):
-        """Create indexes on materialized views for maximum performance"""
+    def _build_fts_indexes(self, conn: duckdb.DuckDBPyConnection) -> List[str]:
+        """Build BM25 indexes over provider names and fact search text; returns the tables indexed
         
-        # Indexes for provider search
-        try:
-            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_provider_search_text ON provider_search_index USING bm25(search_text)")
-            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_provider_org_name ON provider_search_index(org_name_normalized)")
-            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_provider_taxonomy ON provider_search_index(taxonomy_normalized)")
-            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_provider_npi ON provider_search_index(npi)")
-        except:
-            pass  # DuckDB may not support all index types
-        
-        # Indexes for TIN search
-        try:
-            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_tin_value ON tin_provider_index(tin_value)")
-            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_tin_pg_uid ON tin_provider_index(pg_uid)")
-        except:
-            pass
+        Built in `conn`'s default catalog, so the fts macros name their tables without a catalog
+        and keep working under whatever name the cache file is later attached as.
+        """
         
-        # Indexes for procedure search
+        built = []
         try:
-            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_procedure_code ON procedure_search_index(code)")
-            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_procedure_class ON procedure_search_index(proc_class_normalized)")
-            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_procedure_group ON procedure_search_index(proc_group_normalized)")
-        except:
-            pass
+            _load_fts(conn)
+            # FTS indexes need a base table, not a view over parquet
+            conn.execute(f"""
+            CREATE OR REPLACE TABLE dim_npi AS
+            SELECT * FROM read_parquet('{DATA_ROOT / "dims/dim_npi.parquet"}')
+            """)
+            conn.execute("""
+            PRAGMA create_fts_index(
+                'dim_npi', 'npi', 'organization_name', 'first_name', 'last_name', 'primary_taxonomy_desc',
+                overwrite=1
+            )
+            """)
+            built.append("dim_npi")
+        except Exception as e:
+            print(f"Full-text search unavailable, falling back to ILIKE: {e}")
+            return built
         
-        # Indexes for payer search
         try:
-            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_payer_name ON payer_search_index(payer_name_normalized)")
-            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_payer_slug ON payer_search_index(payer_slug)")
-        except:
-            pass
+            # One document per fact; the pre-joined index repeats a fact per provider/TIN
+            conn.execute("""
+            CREATE OR REPLACE TABLE comprehensive_search_text AS
+            SELECT 
+                fact_uid,
+                any_value(proc_class) as proc_class,
+                string_agg(DISTINCT full_search_text, ' ') as full_search_text
+            FROM comprehensive_search_index
+            GROUP BY fact_uid
+            """)
+            conn.execute("""
+            PRAGMA create_fts_index(
+                'comprehensive_search_text', 'fact_uid', 'proc_class', 'full_search_text',
+                stemmer='porter', stopwords='english', overwrite=1
+            )
+            """)
+            built.append("comprehensive_search_text")
+        except Exception as e:
+            print(f"Search-text index unavailable, falling back to ILIKE: {e}")
+        
+        return built
+    
+    def _provider_text_filter(self, field: str, value: str) -> Tuple[str, List[Any]]:
+        """Text match on a dim_npi field - BM25 index lookup when available, ILIKE scan otherwise"""
+        
+        if self.fts_enabled:
+            return (
+                f"""npi IN (
+                SELECT npi FROM dim_npi
+                WHERE fts_main_dim_npi.match_bm25(npi, ?, fields := '{field}') IS NOT NULL
+            )""",
+                [value]
+            )
+        return f"{field} ILIKE ?", [f"%{value}%"]
+    
+    def _search_text_filter(self, field: str, value: str) -> Tuple[str, List[Any]]:
+        """Text match on a fact-level field - BM25 over comprehensive_search_text when built, ILIKE otherwise"""
+        
+        if self.search_text_fts_enabled:
+            # Keyed on the field's matching values, so it also filters tables without fact_uid
+            return (
+                f"""{field} IN (
+                SELECT {field} FROM comprehensive_search_text
+                WHERE fts_main_comprehensive_search_text.match_bm25(fact_uid, ?, fields := '{field}') IS NOT NULL
+            )""",
+                [value]
+            )
+        return f"{field} ILIKE ?", [f"%{value}%"]
+    
+    def _fetch_frame(self, query: str, params: Optional[List[Any]] = None) -> pl.DataFrame:
+        """Run a query and return the Arrow result as a Polars frame with rates rounded"""
+        return _round_rates(self.conn.execute(query, params or []).pl())
+    
+    def _fetch_dicts(self, query: str, params: Optional[List[Any]] = None) -> List[Dict[str, Any]]:
+        """Run a query and convert the result to dicts column-wise via Polars"""
+        return self._fetch_frame(query, params).to_dicts()
     
     def search_by_tin(self, tin_value: str, state: str, year_month: str, 
                      limit: int = 100) -> List[Dict[str, Any]]:
-        """Fast TIN-based search using materialized view"""
+        """Fast TIN-based search over precomputed per-TIN rate aggregates"""
         
-        query = f"""
-        SELECT DISTINCT
+        query = """
+        SELECT
             tin_value,
             tin_type,
             npi,
@@ -277,48 +960,28 @@ class OptimizedMRFQueries:
             primary_taxonomy_desc,
             payer_slug,
             reporting_entity_name,
-            COUNT(*) as rate_count,
-            AVG(negotiated_rate) as avg_rate,
-            MIN(negotiated_rate) as min_rate,
-            MAX(negotiated_rate) as max_rate
-        FROM tin_provider_index
-        WHERE tin_value = '{tin_value}'
-          AND state = '{state}'
-          AND year_month = '{year_month}'
-        GROUP BY tin_value, tin_type, npi, organization_name, first_name, last_name, 
-                 primary_taxonomy_desc, payer_slug, reporting_entity_name
+            rate_count,
+            avg_rate,
+            min_rate,
+            max_rate
+        FROM tin_rate_agg
+        WHERE tin_value = ?
+          AND state = ?
+          AND year_month = ?
         ORDER BY rate_count DESC
-        LIMIT {limit}
+        LIMIT ?
         """
         
-        result = self.conn.execute(query).fetchall()
-        
-        return [
-            {
-                "tin_value": row[0],
-                "tin_type": row[1],
-                "npi": row[2],
-                "organization_name": row[3],
-                "first_name": row[4],
-                "last_name": row[5],
-                "primary_taxonomy_desc": row[6],
-                "payer_slug": row[7],
-                "reporting_entity_name": row[8],
-                "rate_count": row[9],
-                "avg_rate": round(row[10], 2) if row[10] else 0,
-                "min_rate": round(row[11], 2) if row[11] else 0,
-                "max_rate": round(row[12], 2) if row[12] else 0
-            }
-            for row in result
-        ]
+        return self._fetch_dicts(query, [tin_value, state, year_month, limit])
     
     def search_by_organization(self, org_name: str, state: str, year_month: str,
                               limit: int = 100) -> List[Dict[str, Any]]:
-        """Fast organization name search using materialized view"""
+        """Fast organization name search over the per-provider rate aggregates"""
+        
+        text_filter, text_params = self._provider_text_filter("organization_name", org_name)
         
-        # Use ILIKE for case-insensitive partial matching
         query = f"""
-        SELECT DISTINCT
+        SELECT
             npi,
             organization_name,
             first_name,
@@ -329,48 +992,28 @@ class OptimizedMRFQueries:
             city,
             provider_state,
             postal_code,
-            COUNT(*) as rate_count,
-            AVG(negotiated_rate) as avg_rate,
-            MIN(negotiated_rate) as min_rate,
-            MAX(negotiated_rate) as max_rate
-        FROM comprehensive_search_index
-        WHERE organization_name ILIKE '%{org_name}%'
-          AND state = '{state}'
-          AND year_month = '{year_month}'
-        GROUP BY npi, organization_name, first_name, last_name, primary_taxonomy_desc,
-                 status, enumeration_type, city, provider_state, postal_code
+            rate_count,
+            avg_rate,
+            min_rate,
+            max_rate
+        FROM provider_rate_agg
+        WHERE {text_filter}
+          AND state = ?
+          AND year_month = ?
         ORDER BY rate_count DESC
-        LIMIT {limit}
+        LIMIT ?
         """
         
-        result = self.conn.execute(query).fetchall()
-        
-        return [
-            {
-                "npi": row[0],
-                "organization_name": row[1],
-                "first_name": row[2],
-                "last_name": row[3],
-                "primary_taxonomy_desc": row[4],
-                "status": row[5],
-                "enumeration_type": row[6],
-                "city": row[7],
-                "provider_state": row[8],
-                "postal_code": row[9],
-                "rate_count": row[10],
-                "avg_rate": round(row[11], 2) if row[11] else 0,
-                "min_rate": round(row[12], 2) if row[12] else 0,
-                "max_rate": round(row[13], 2) if row[13] else 0
-            }
-            for row in result
-        ]
+        return self._fetch_dicts(query, text_params + [state, year_month, limit])
     
     def search_by_taxonomy(self, taxonomy_desc: str, state: str, year_month: str,
                           limit: int = 100) -> List[Dict[str, Any]]:
         """Fast taxonomy description search"""
         
+        text_filter, text_params = self._provider_text_filter("primary_taxonomy_desc", taxonomy_desc)
+        
         query = f"""
-        SELECT DISTINCT
+        SELECT
             npi,
             organization_name,
             first_name,
@@ -379,133 +1022,80 @@ class OptimizedMRFQueries:
             city,
             provider_state,
             postal_code,
-            COUNT(*) as rate_count,
-            AVG(negotiated_rate) as avg_rate,
-            MIN(negotiated_rate) as min_rate,
-            MAX(negotiated_rate) as max_rate
-        FROM comprehensive_search_index
-        WHERE primary_taxonomy_desc ILIKE '%{taxonomy_desc}%'
-          AND state = '{state}'
-          AND year_month = '{year_month}'
-        GROUP BY npi, organization_name, first_name, last_name, primary_taxonomy_desc,
-                 city, provider_state, postal_code
+            rate_count,
+            avg_rate,
+            min_rate,
+            max_rate
+        FROM provider_rate_agg
+        WHERE {text_filter}
+          AND state = ?
+          AND year_month = ?
         ORDER BY rate_count DESC
-        LIMIT {limit}
+        LIMIT ?
         """
         
-        result = self.conn.execute(query).fetchall()
-        
-        return [
-            {
-                "npi": row[0],
-                "organization_name": row[1],
-                "first_name": row[2],
-                "last_name": row[3],
-                "primary_taxonomy_desc": row[4],
-                "city": row[5],
-                "provider_state": row[6],
-                "postal_code": row[7],
-                "rate_count": row[8],
-                "avg_rate": round(row[9], 2) if row[9] else 0,
-                "min_rate": round(row[10], 2) if row[10] else 0,
-                "max_rate": round(row[11], 2) if row[11] else 0
-            }
-            for row in result
-        ]
+        return self._fetch_dicts(query, text_params + [state, year_month, limit])
     
     def search_by_procedure_category(self, proc_class: str, state: str, year_month: str,
                                    limit: int = 100) -> List[Dict[str, Any]]:
         """Fast procedure category search"""
         
+        text_filter, text_params = self._search_text_filter("proc_class", proc_class)
         query = f"""
-        SELECT DISTINCT
+        SELECT
             code,
             code_type,
             proc_set,
             proc_class,
             proc_group,
-            COUNT(*) as rate_count,
-            AVG(negotiated_rate) as avg_rate,
-            MIN(negotiated_rate) as min_rate,
-            MAX(negotiated_rate) as max_rate,
-            COUNT(DISTINCT payer_slug) as unique_payers
-        FROM procedure_search_index
-        WHERE proc_class ILIKE '%{proc_class}%'
-          AND state = '{state}'
-          AND year_month = '{year_month}'
+            SUM(rate_count)::BIGINT as rate_count,
+            SUM(sum_rate) / SUM(rated_count) as avg_rate,
+            MIN(min_rate) as min_rate,
+            MAX(max_rate) as max_rate,
+            len(list_distinct(flatten(list(payer_slugs)))) as unique_payers
+        FROM code_rate_agg
+        WHERE {text_filter}
+          AND state = ?
+          AND year_month = ?
         GROUP BY code, code_type, proc_set, proc_class, proc_group
         ORDER BY rate_count DESC
-        LIMIT {limit}
+        LIMIT ?
         """
         
-        result = self.conn.execute(query).fetchall()
-        
-        return [
-            {
-                "code": row[0],
-                "code_type": row[1],
-                "proc_set": row[2],
-                "proc_class": row[3],
-                "proc_group": row[4],
-                "rate_count": row[5],
-                "avg_rate": round(row[6], 2) if row[6] else 0,
-                "min_rate": round(row[7], 2) if row[7] else 0,
-                "max_rate": round(row[8], 2) if row[8] else 0,
-                "unique_payers": row[9]
-            }
-            for row in result
-        ]
+        return self._fetch_dicts(query, text_params + [state, year_month, limit])
     
     def search_by_billing_code(self, billing_code: str, state: str, year_month: str,
                               limit: int = 100) -> List[Dict[str, Any]]:
         """Fast billing code search"""
         
-        query = f"""
-        SELECT DISTINCT
+        query = """
+        SELECT
             code,
             code_type,
             proc_set,
             proc_class,
             proc_group,
             billing_class,
-            COUNT(*) as rate_count,
-            AVG(negotiated_rate) as avg_rate,
-            MIN(negotiated_rate) as min_rate,
-            MAX(negotiated_rate) as max_rate,
-            COUNT(DISTINCT payer_slug) as unique_payers
-        FROM procedure_search_index
-        WHERE code = '{billing_code}'
-          AND state = '{state}'
-          AND year_month = '{year_month}'
-        GROUP BY code, code_type, proc_set, proc_class, proc_group, billing_class
+            rate_count,
+            sum_rate / rated_count as avg_rate,
+            min_rate,
+            max_rate,
+            coalesce(len(payer_slugs), 0) as unique_payers
+        FROM code_rate_agg
+        WHERE code = ?
+          AND state = ?
+          AND year_month = ?
         ORDER BY rate_count DESC
-        LIMIT {limit}
+        LIMIT ?
         """
         
-        result = self.conn.execute(query).fetchall()
-        
-        return [
-            {
-                "code": row[0],
-                "code_type": row[1],
-                "proc_set": row[2],
-                "proc_class": row[3],
-                "proc_group": row[4],
-                "billing_class": row[5],
-                "rate_count": row[6],
-                "avg_rate": round(row[7], 2) if row[7] else 0,
-                "min_rate": round(row[8], 2) if row[8] else 0,
-                "max_rate": round(row[9], 2) if row[9] else 0,
-                "unique_payers": row[10]
-            }
-            for row in result
-        ]
+        return self._fetch_dicts(query, [billing_code, state, year_month, limit])
     
     def search_by_payer(self, payer_name: str, state: str, year_month: str,
                        limit: int = 100) -> List[Dict[str, Any]]:
         """Fast payer search"""
         
-        query = f"""
+        query = """
         SELECT 
             payer_slug,
             reporting_entity_name,
@@ -516,28 +1106,14 @@ class OptimizedMRFQueries:
             unique_procedures,
             unique_provider_groups
         FROM payer_search_index
-        WHERE reporting_entity_name ILIKE '%{payer_name}%'
-          AND state = '{state}'
-          AND year_month = '{year_month}'
+        WHERE payer_name_normalized LIKE ?
+          AND state = ?
+          AND year_month = ?
         ORDER BY rate_count DESC
-        LIMIT {limit}
+        LIMIT ?
         """
         
-        result = self.conn.execute(query).fetchall()
-        
-        return [
-            {
-                "payer_slug": row[0],
-                "reporting_entity_name": row[1],
-                "rate_count": row[2],
-                "avg_rate": round(row[3], 2) if row[3] else 0,
-                "min_rate": round(row[4], 2) if row[4] else 0,
-                "max_rate": round(row[5], 2) if row[5] else 0,
-                "unique_procedures": row[6],
-                "unique_provider_groups": row[7]
-            }
-            for row in result
-        ]
+        return self._fetch_dicts(query, [f"%{payer_name.strip().lower()}%", state, year_month, limit])
     
     def multi_field_search(self, state: str, year_month: str,
                           primary_taxonomy_desc: Optional[List[str]] = None,
@@ -562,168 +1138,195 @@ class OptimizedMRFQueries:
             # Limit result size to prevent memory issues
             limit = min(limit, 1000)  # Cap at 1000 results
             
-            where_conditions = ["f.state = ?", "f.year_month = ?"]
-            params = [state, year_month]
-            
-            # Helper function to build IN clause for lists (SQL injection safe)
-            def build_in_clause(field, values):
-                if not values:
-                    return None, []
-                if isinstance(values, list):
-                    placeholders = ','.join(['?' for _ in values])
-                    return f"{field} IN ({placeholders})", values
-                else:
-                    return f"{field} = ?", [values]
-            
-            # Helper function to build ILIKE clause for lists (SQL injection safe)
-            def build_ilike_clause(field, values):
-                if not values:
-                    return None, []
-                if isinstance(values, list):
-                    conditions = [f"{field} ILIKE ?" for _ in values]
-                    like_values = [f"%{v}%" for v in values]
-                    return f"({' OR '.join(conditions)})", like_values
-                else:
-                    return f"{field} ILIKE ?", [f"%{values}%"]
-        
-            # Provider filters
-            if primary_taxonomy_desc:
-                condition, new_params = build_in_clause("n.primary_taxonomy_desc", primary_taxonomy_desc)
-                if condition:
-                    where_conditions.append(condition)
-                    params.extend(new_params)
-            if organization_name:
-                condition, new_params = build_ilike_clause("n.organization_name", organization_name)
-                if condition:
-                    where_conditions.append(condition)
-                    params.extend(new_params)
-            if npi:
-                condition, new_params = build_in_clause("n.npi", npi)
-                if condition:
-                    where_conditions.append(condition)
-                    params.extend(new_params)
-            if enumeration_type:
-                condition, new_params = build_in_clause("n.enumeration_type", enumeration_type)
-                if condition:
-                    where_conditions.append(condition)
-                    params.extend(new_params)
-            
-            # Procedure filters
-            if billing_class:
-                condition, new_params = build_in_clause("f.billing_class", billing_class)
-                if condition:
-                    where_conditions.append(condition)
-                    params.extend(new_params)
-            if proc_set:
-                condition, new_params = build_in_clause("cc.proc_set", proc_set)
-                if condition:
-                    where_conditions.append(condition)
-                    params.extend(new_params)
-            if proc_class:
-                condition, new_params = build_in_clause("cc.proc_class", proc_class)
-                if condition:
-                    where_conditions.append(condition)
-                    params.extend(new_params)
-            if proc_group:
-                condition, new_params = build_in_clause("cc.proc_group", proc_group)
-                if condition:
-                    where_conditions.append(condition)
-                    params.extend(new_params)
-            if billing_code:
-                condition, new_params = build_in_clause("f.code", billing_code)
-                if condition:
-                    where_conditions.append(condition)
-                    params.extend(new_params)
-            
-            # TIN and payer filters
-            if tin_value:
-                condition, new_params = build_in_clause("xt.tin_value", tin_value)
-                if condition:
-                    where_conditions.append(condition)
-                    params.extend(new_params)
-            if payer:
-                condition, new_params = build_ilike_clause("f.reporting_entity_name", payer)
-                if condition:
-                    where_conditions.append(condition)
-                    params.extend(new_params)
-            
-            where_clause = " AND ".join(where_conditions)
-        
-            # Query directly from tables instead of materialized view to save memory
-            query = f"""
-            SELECT DISTINCT
-                f.fact_uid,
-                n.npi,
-                n.organization_name,
-                n.first_name,
-                n.last_name,
-                n.primary_taxonomy_desc,
-                f.code,
-                f.code_type,
-                cc.proc_class,
-                cc.proc_group,
-                xt.tin_value,
-                xt.tin_type,
-                f.reporting_entity_name,
-                f.negotiated_rate,
-                f.billing_class,
-                f.negotiated_type,
-                f.negotiation_arrangement,
-                na.city,
-                na.state as provider_state,
-                na.postal_code
-            FROM read_parquet('{DATA_ROOT / "gold/fact_rate.parquet"}') f
-            LEFT JOIN read_parquet('{DATA_ROOT / "xrefs/xref_pg_member_npi.parquet"}') xn 
-                ON f.pg_uid = xn.pg_uid
-            LEFT JOIN read_parquet('{DATA_ROOT / "dims/dim_npi.parquet"}') n 
-                ON xn.npi = n.npi
-            LEFT JOIN read_parquet('{DATA_ROOT / "xrefs/xref_pg_member_tin.parquet"}') xt 
-                ON f.pg_uid = xt.pg_uid
-            LEFT JOIN read_parquet('{DATA_ROOT / "dims/dim_code_cat.parquet"}') cc 
-                ON f.code = cc.proc_cd
-            LEFT JOIN read_parquet('{DATA_ROOT / "dims/dim_npi_address.parquet"}') na 
-                ON n.npi = na.npi AND na.address_purpose = 'LOCATION'
-            WHERE {where_clause}
-            ORDER BY f.negotiated_rate DESC
-            LIMIT {limit}
-            """
-            
-            # Execute query with parameters to prevent SQL injection
-            result = self.conn.execute(query, params).fetchall()
-            
-            return [
-                {
-                    "fact_uid": row[0],
-                    "npi": row[1],
-                    "organization_name": row[2],
-                    "first_name": row[3],
-                    "last_name": row[4],
-                    "primary_taxonomy_desc": row[5],
-                    "code": row[6],
-                    "code_type": row[7],
-                    "proc_class": row[8],
-                    "proc_group": row[9],
-                    "tin_value": row[10],
-                    "tin_type": row[11],
-                    "reporting_entity_name": row[12],
-                    "negotiated_rate": round(row[13], 2) if row[13] else 0,
-                    "billing_class": row[14],
-                    "negotiated_type": row[15],
-                    "negotiation_arrangement": row[16],
-                    "city": row[17],
-                    "provider_state": row[18],
-                    "postal_code": row[19]
-                }
-                for row in result
-            ]
+            batches = self.stream_multi_field_search(
+                state, year_month,
+                primary_taxonomy_desc=primary_taxonomy_desc,
+                organization_name=organization_name,
+                npi=npi,
+                enumeration_type=enumeration_type,
+                billing_class=billing_class,
+                proc_set=proc_set,
+                proc_class=proc_class,
+                proc_group=proc_group,
+                billing_code=billing_code,
+                tin_value=tin_value,
+                payer=payer,
+                limit=limit
+            )
+            return [row for batch in batches for row in pl.from_arrow(batch).to_dicts()]
             
         except Exception as e:
             print(f"Error in multi_field_search: {e}")
             return []  # Return empty list instead of crashing
     
+    def stream_multi_field_search(self, state: str, year_month: str,
+                                  primary_taxonomy_desc: Optional[List[str]] = None,
+                                  organization_name: Optional[List[str]] = None,
+                                  npi: Optional[List[str]] = None,
+                                  enumeration_type: Optional[List[str]] = None,
+                                  billing_class: Optional[List[str]] = None,
+                                  proc_set: Optional[List[str]] = None,
+                                  proc_class: Optional[List[str]] = None,
+                                  proc_group: Optional[List[str]] = None,
+                                  billing_code: Optional[List[str]] = None,
+                                  tin_value: Optional[List[str]] = None,
+                                  payer: Optional[List[str]] = None,
+                                  limit: Optional[int] = None,
+                                  batch_size: int = 10_000) -> Iterator["pyarrow.RecordBatch"]:
+        """Multi-field search yielding Arrow record batches as DuckDB produces them
+        
+        Unlike multi_field_search the result is uncapped (limit=None returns every row),
+        so large exports can be streamed without building the full list in memory.
+        """
+        
+        where_conditions = ["f.state = ?", "f.year_month = ?"]
+        params = [state, year_month]
+        
+        # Helper function to build IN clause for lists (SQL injection safe).
+        # The list binds as one LIST parameter, so the SQL text is the same for any arity
+        def build_in_clause(field, values):
+            if not values:
+                return None, []
+            if isinstance(values, list):
+                return f"{field} IN (SELECT unnest(?))", [values]
+            else:
+                return f"{field} = ?", [values]
+        
+        # Helper function to build ILIKE clause for lists (SQL injection safe)
+        def build_ilike_clause(field, values):
+            if not values:
+                return None, []
+            if isinstance(values, list):
+                return (
+                    f"EXISTS (SELECT 1 FROM unnest(?) AS p(pattern) WHERE {field} ILIKE '%' || p.pattern || '%')",
+                    [values]
+                )
+            else:
+                return f"{field} ILIKE ?", [f"%{values}%"]
+    
+        # Provider filters
+        if primary_taxonomy_desc:
+            condition, new_params = build_in_clause("n.primary_taxonomy_desc", primary_taxonomy_desc)
+            if condition:
+                where_conditions.append(condition)
+                params.extend(new_params)
+        if organization_name:
+            condition, new_params = build_ilike_clause("n.organization_name", organization_name)
+            if condition:
+                where_conditions.append(condition)
+                params.extend(new_params)
+        if npi:
+            condition, new_params = build_in_clause("n.npi", npi)
+            if condition:
+                where_conditions.append(condition)
+                params.extend(new_params)
+        if enumeration_type:
+            condition, new_params = build_in_clause("n.enumeration_type", enumeration_type)
+            if condition:
+                where_conditions.append(condition)
+                params.extend(new_params)
+        
+        # Procedure filters
+        if billing_class:
+            condition, new_params = build_in_clause("f.billing_class", billing_class)
+            if condition:
+                where_conditions.append(condition)
+                params.extend(new_params)
+        if proc_set:
+            condition, new_params = build_in_clause("cc.proc_set", proc_set)
+            if condition:
+                where_conditions.append(condition)
+                params.extend(new_params)
+        if proc_class:
+            condition, new_params = build_in_clause("cc.proc_class", proc_class)
+            if condition:
+                where_conditions.append(condition)
+                params.extend(new_params)
+        if proc_group:
+            condition, new_params = build_in_clause("cc.proc_group", proc_group)
+            if condition:
+                where_conditions.append(condition)
+                params.extend(new_params)
+        if billing_code:
+            condition, new_params = build_in_clause("f.code", billing_code)
+            if condition:
+                where_conditions.append(condition)
+                params.extend(new_params)
+        
+        # TIN and payer filters
+        if tin_value:
+            condition, new_params = build_in_clause("xt.tin_value", tin_value)
+            if condition:
+                where_conditions.append(condition)
+                params.extend(new_params)
+        if payer:
+            condition, new_params = build_ilike_clause("f.reporting_entity_name", payer)
+            if condition:
+                where_conditions.append(condition)
+                params.extend(new_params)
+        
+        where_clause = " AND ".join(where_conditions)
+        
+        # Query directly from tables instead of materialized view to save memory
+        query = f"""
+        SELECT DISTINCT
+            f.fact_uid,
+            n.npi,
+            n.organization_name,
+            n.first_name,
+            n.last_name,
+            n.primary_taxonomy_desc,
+            f.code,
+            f.code_type,
+            cc.proc_class,
+            cc.proc_group,
+            xt.tin_value,
+            xt.tin_type,
+            f.reporting_entity_name,
+            -- Batches skip _round_rates, so round to cents (nulls as 0) here
+            COALESCE(ROUND(f.negotiated_rate::DOUBLE, 2), 0) as negotiated_rate,
+            f.billing_class,
+            f.negotiated_type,
+            f.negotiation_arrangement,
+            na.city,
+            na.state as provider_state,
+            na.postal_code
+        FROM {_parquet_source(FACT_SOURCE)} f
+        LEFT JOIN read_parquet('{DATA_ROOT / "xrefs/xref_pg_member_npi.parquet"}') xn 
+            ON f.{self.pg_key} = xn.{self.pg_key}
+        LEFT JOIN read_parquet('{DATA_ROOT / "dims/dim_npi.parquet"}') n 
+            ON xn.npi = n.npi
+        LEFT JOIN read_parquet('{DATA_ROOT / "xrefs/xref_pg_member_tin.parquet"}') xt 
+            ON f.{self.pg_key} = xt.{self.pg_key}
+        LEFT JOIN read_parquet('{DATA_ROOT / "dims/dim_code_cat.parquet"}') cc 
+            ON f.code = cc.proc_cd
+        LEFT JOIN read_parquet('{DATA_ROOT / "dims/dim_npi_address.parquet"}') na 
+            ON n.npi = na.npi AND na.address_purpose = 'LOCATION'
+        WHERE {where_clause}
+        ORDER BY f.negotiated_rate DESC
+        {"LIMIT ?" if limit is not None else ""}
+        """
+        if limit is not None:
+            params.append(limit)
+        
+        # A dedicated cursor, since the batches may be consumed after this thread's
+        # cursor has moved on to other queries (or from another thread entirely)
+        cursor = _get_shared_connection().cursor()
+        try:
+            # Execute query with parameters to prevent SQL injection
+            reader = cursor.execute(query, params).fetch_record_batch(batch_size)
+            yield from reader
+        finally:
+            cursor.close()
+    
     def get_autocomplete_suggestions(self, field: str, query: str, state: str, year_month: str,
-                                   limit: int = 20) -> List[str]:
-        """Get autocomplete suggestions for various fields"""
+                                   limit: int = 20, contains: bool = False) -> List[str]:
+        """Get autocomplete suggestions for various fields
+        
+        Matches values starting with `query`. The table is sorted by field, state and month, so
+        zone maps skip to that slice before the prefix filter runs; pass contains=True for the
+        slower match anywhere in the value.
+        """
         
         # Map field names to SQL fields and tables
         field_mapping = {
@@ -748,17 +1351,32 @@ class OptimizedMRFQueries:
             return []
         
         sql_field, table = field_mapping[field]
+        pattern = f"%{query.lower()}%" if contains else f"{query.lower()}%"
+        
+        if self.autocomplete_ready:
+            # Keystroke lookups hit the small precomputed value table, not the joined facts
+            return self.conn.execute(
+                """
+                SELECT value FROM dim_autocomplete
+                WHERE field = ? AND state = ? AND year_month = ? AND value_lower LIKE ?
+                ORDER BY value
+                LIMIT ?
+                """,
+                [sql_field.split(".", 1)[1], state, year_month, pattern, limit]
+            ).pl().to_series().to_list()
         
         # Build the search query with proper table prefixes
         where_conditions = [
-            f"f.state = '{state}'",
-            f"f.year_month = '{year_month}'",
+            "f.state = ?",
+            "f.year_month = ?",
             f"{sql_field} IS NOT NULL",
             f"{sql_field} != ''"
         ]
+        params = [state, year_month]
         
         if query:
-            where_conditions.append(f"{sql_field} ILIKE '%{query}%'")
+            where_conditions.append(f"{sql_field} ILIKE ?")
+            params.append(pattern)
         
         where_clause = " AND ".join(where_conditions)
         
@@ -766,18 +1384,18 @@ class OptimizedMRFQueries:
         if table == "comprehensive_search_index":
             search_query = f"""
             SELECT DISTINCT {sql_field}
-            FROM read_parquet('{DATA_ROOT / "gold/fact_rate.parquet"}') f
+            FROM {_parquet_source(FACT_SOURCE)} f
             LEFT JOIN read_parquet('{DATA_ROOT / "xrefs/xref_pg_member_npi.parquet"}') xn 
-                ON f.pg_uid = xn.pg_uid
+                ON f.{self.pg_key} = xn.{self.pg_key}
             LEFT JOIN read_parquet('{DATA_ROOT / "dims/dim_npi.parquet"}') n 
                 ON xn.npi = n.npi
             LEFT JOIN read_parquet('{DATA_ROOT / "xrefs/xref_pg_member_tin.parquet"}') xt 
-                ON f.pg_uid = xt.pg_uid
+                ON f.{self.pg_key} = xt.{self.pg_key}
             LEFT JOIN read_parquet('{DATA_ROOT / "dims/dim_code_cat.parquet"}') cc 
                 ON f.code = cc.proc_cd
             WHERE {where_clause}
             ORDER BY {sql_field}
-            LIMIT {limit}
+            LIMIT ?
             """
         else:
             search_query = f"""
@@ -785,12 +1403,13 @@ class OptimizedMRFQueries:
             FROM {table}
             WHERE {where_clause}
             ORDER BY {sql_field}
-            LIMIT {limit}
+            LIMIT ?
             """
         
+        params.append(limit)
+        
         try:
-            result = self.conn.execute(search_query).fetchall()
-            return [row[0] for row in result if row[0]]
+            return self.conn.execute(search_query, params).pl().to_series().drop_nulls().to_list()
         except Exception as e:
             print(f"Error in autocomplete for {field}: {e}")
             return []
@@ -798,7 +1417,7 @@ class OptimizedMRFQueries:
     def get_search_statistics(self, state: str, year_month: str) -> Dict[str, Any]:
         """Get search statistics for the dashboard"""
         
-        query = f"""
+        query = """
         SELECT 
             COUNT(DISTINCT npi) as unique_providers,
             COUNT(DISTINCT organization_name) as unique_organizations,
@@ -809,24 +1428,20 @@ class OptimizedMRFQueries:
             COUNT(DISTINCT tin_value) as unique_tins,
             COUNT(*) as total_records
         FROM comprehensive_search_index
-        WHERE state = '{state}' AND year_month = '{year_month}'
+        WHERE state = ? AND year_month = ?
         """
         
-        result = self.conn.execute(query).fetchone()
-        
-        return {
-            "unique_providers": result[0],
-            "unique_organizations": result[1],
-            "unique_taxonomies": result[2],
-            "unique_procedures": result[3],
-            "unique_procedure_classes": result[4],
-            "unique_payers": result[5],
-            "unique_tins": result[6],
-            "total_records": result[7]
-        }
+        # Column aliases are already the response keys
+        return self._fetch_dicts(query, [state, year_month])[0]
     
-    def explore_data_availability(self, state: str, year_month: str, category: str, limit: int = 25, offset: int = 0) -> List[Dict[str, Any]]:
-        """Explore data availability by category to help users understand what data exists"""
+    @_cached_result
+    def explore_data_availability(self, state: str, year_month: str, category: str, limit: int = 25, offset: int = 0,
+                                  cursor: Optional[Tuple[int, str]] = None) -> List[Dict[str, Any]]:
+        """Explore data availability by category to help users understand what data exists
+        
+        Pages are ordered by record_count then value, both descending. Pass the last row's
+        (record_count, value) as `cursor` to fetch the next page without an OFFSET scan.
+        """
         
         # Map category names to SQL fields and additional info
         category_mapping = {
@@ -860,130 +1475,105 @@ class OptimizedMRFQueries:
         if category not in category_mapping:
             return []
         
-        field = category_mapping[category]["field"]
+        params = [state, year_month, category]
+        cursor_filter = ""
+        if cursor is not None:
+            # Keyset pagination: resume strictly after the previous page's last row
+            last_count, last_value = cursor
+            cursor_filter = "AND (record_count < ? OR (record_count = ? AND value < ?))"
+            params.extend([last_count, last_count, last_value])
+            offset = 0
         
-        # Optimized query with pagination and reduced calculations
+        # Groups are precomputed per state/month/category at refresh
         query = f"""
         SELECT 
-            {field} as value,
-            COUNT(*) as record_count,
-            COUNT(DISTINCT npi) as unique_providers,
-            COUNT(DISTINCT code) as unique_procedures,
-            ROUND(AVG(negotiated_rate), 2) as avg_rate,
-            ROUND(MIN(negotiated_rate), 2) as min_rate,
-            ROUND(MAX(negotiated_rate), 2) as max_rate
-        FROM comprehensive_search_index
-        WHERE state = '{state}' 
-          AND year_month = '{year_month}'
-          AND {field} IS NOT NULL 
-          AND {field} != ''
-        GROUP BY {field}
-        ORDER BY record_count DESC
-        LIMIT {limit} OFFSET {offset}
+            value,
+            record_count,
+            unique_providers,
+            unique_procedures,
+            avg_rate,
+            min_rate,
+            max_rate
+        FROM category_agg
+        WHERE state = ? 
+          AND year_month = ?
+          AND category = ?
+          {cursor_filter}
+        ORDER BY record_count DESC, value DESC
+        LIMIT ? OFFSET ?
         """
+        params.extend([limit, offset])
         
-        result = self.conn.execute(query).fetchall()
-        
-        return [
-            {
-                "value": row[0],
-                "record_count": row[1],
-                "unique_providers": row[2],
-                "unique_procedures": row[3],
-                "avg_rate": row[4] if row[4] else 0,
-                "min_rate": row[5] if row[5] else 0,
-                "max_rate": row[6] if row[6] else 0,
-                "category_info": category_mapping[category]
-            }
-            for row in result
-        ]
+        # Attach the category metadata as a struct column rather than per row
+        category_info = pl.struct(
+            pl.lit(v).alias(k) for k, v in category_mapping[category].items()
+        ).alias("category_info")
+        availability = self._fetch_frame(query, params)
+        return availability.with_columns(category_info).to_dicts()
     
+    @_cached_result
     def get_category_statistics(self, state: str, year_month: str) -> Dict[str, Any]:
         """Get high-level statistics for each category to show data availability"""
         
-        # Get counts for each major category
-        query = f"""
-        SELECT 
-            COUNT(DISTINCT reporting_entity_name) as unique_payers,
-            COUNT(DISTINCT organization_name) as unique_organizations,
-            COUNT(DISTINCT primary_taxonomy_desc) as unique_taxonomies,
-            COUNT(DISTINCT proc_set) as unique_procedure_sets,
-            COUNT(DISTINCT proc_class) as unique_procedure_classes,
-            COUNT(DISTINCT code) as unique_procedures,
-            COUNT(DISTINCT npi) as unique_providers,
-            COUNT(DISTINCT tin_value) as unique_tins,
-            COUNT(*) as total_records
-        FROM comprehensive_search_index
-        WHERE state = '{state}' AND year_month = '{year_month}'
-        """
-        
-        result = self.conn.execute(query).fetchone()
+        # Counts for each major category are precomputed per state/month at refresh
+        rows = self._fetch_dicts(
+            "SELECT * FROM category_stats WHERE state = ? AND year_month = ?",
+            [state, year_month]
+        )
+        if rows:
+            counts = rows[0]
+        else:
+            counts = self._fetch_dicts(f"""
+            SELECT {CATEGORY_STATS_SELECT}
+            FROM comprehensive_search_index
+            WHERE state = ? AND year_month = ?
+            """, [state, year_month])[0]
         
-        return {
-            "payer": {
-                "count": result[0],
-                "label": "Payers",
-                "description": "Insurance companies and payers"
-            },
-            "organization": {
-                "count": result[1],
-                "label": "Organizations", 
-                "description": "Healthcare organizations and provider groups"
-            },
-            "taxonomy": {
-                "count": result[2],
-                "label": "Taxonomies",
-                "description": "Provider specialties and classifications"
-            },
-            "procedure_set": {
-                "count": result[3],
-                "label": "Procedure Sets",
-                "description": "High-level procedure categories"
-            },
-            "procedure_class": {
-                "count": result[4],
-                "label": "Procedure Classes",
-                "description": "Detailed procedure classifications"
-            },
-            "procedure": {
-                "count": result[5],
-                "label": "Procedures",
-                "description": "Individual procedure codes"
-            },
-            "provider": {
-                "count": result[6],
-                "label": "Providers",
-                "description": "Individual healthcare providers"
-            },
-            "tin": {
-                "count": result[7],
-                "label": "TINs",
-                "description": "Tax identification numbers"
-            },
-            "total_records": result[8]
+        stats = {
+            category: {"count": counts[column], **meta}
+            for category, (column, meta) in CATEGORY_STATS_META.items()
         }
+        stats["total_records"] = counts["total_records"]
+        return stats
     
+    @_cached_result
     def drill_down_exploration(self, state: str, year_month: str, category: str, 
                              selected_value: str, drill_category: str, limit: int = 50) -> List[Dict[str, Any]]:
         """Drill down from one category to another to see related data"""
         
-        # Map category names to SQL fields
-        category_mapping = {
-            "payer": "reporting_entity_name",
-            "organization": "organization_name",
-            "taxonomy": "primary_taxonomy_desc", 
-            "procedure_set": "proc_set",
-            "procedure_class": "proc_class",
-            "procedure": "code",
-            "provider": "npi",
-            "tin": "tin_value"
-        }
-        
-        if category not in category_mapping or drill_category not in category_mapping:
+        if category not in DRILLDOWN_FIELDS or drill_category not in DRILLDOWN_FIELDS:
             return []
         
-        source_field = category_mapping[category]
-        drill_field = category_mapping[drill_category]
+        if (category, drill_category) in DRILLDOWN_PAIRS:
+            # Hot pairs are precomputed at refresh, so this is a lookup of one source value's rows
+            query = """
+            SELECT 
+                value,
+                record_count,
+                unique_providers,
+                unique_procedures,
+                avg_rate,
+                min_rate,
+                max_rate
+            FROM drilldown_agg
+            WHERE state = ? 
+              AND year_month = ?
+              AND source_category = ?
+              AND drill_category = ?
+              AND source_value = ?
+            ORDER BY record_count DESC, value DESC
+            LIMIT ?
+            """
+            params = [state, year_month, category, drill_category, selected_value, limit]
+            drilldown = self._fetch_frame(query, params).with_columns(
+                pl.lit(category).alias("source_category"),
+                pl.lit(selected_value).alias("source_value"),
+                pl.lit(drill_category).alias("drill_category")
+            )
+            return drilldown.to_dicts()
+        
+        source_field = DRILLDOWN_FIELDS[category]
+        drill_field = DRILLDOWN_FIELDS[drill_category]
         
         query = f"""
         SELECT 
@@ -991,44 +1581,39 @@ class OptimizedMRFQueries:
             COUNT(*) as record_count,
             COUNT(DISTINCT npi) as unique_providers,
             COUNT(DISTINCT code) as unique_procedures,
-            AVG(negotiated_rate) as avg_rate,
-            MIN(negotiated_rate) as min_rate,
-            MAX(negotiated_rate) as max_rate
+            AVG(negotiated_rate::DOUBLE) as avg_rate,
+            MIN(negotiated_rate::DOUBLE) as min_rate,
+            MAX(negotiated_rate::DOUBLE) as max_rate
         FROM comprehensive_search_index
-        WHERE state = '{state}' 
-          AND year_month = '{year_month}'
-          AND {source_field} = '{selected_value}'
+        WHERE state = ? 
+          AND year_month = ?
+          AND {source_field} = ?
           AND {drill_field} IS NOT NULL 
           AND {drill_field} != ''
         GROUP BY {drill_field}
-        ORDER BY record_count DESC
-        LIMIT {limit}
+        ORDER BY record_count DESC, value DESC
+        LIMIT ?
         """
         
-        result = self.conn.execute(query).fetchall()
-        
-        return [
-            {
-                "value": row[0],
-                "record_count": row[1],
-                "unique_providers": row[2],
-                "unique_procedures": row[3],
-                "avg_rate": round(row[4], 2) if row[4] else 0,
-                "min_rate": round(row[5], 2) if row[5] else 0,
-                "max_rate": round(row[6], 2) if row[6] else 0,
-                "source_category": category,
-                "source_value": selected_value,
-                "drill_category": drill_category
-            }
-            for row in result
-        ]
+        drilldown = self._fetch_frame(query, [state, year_month, selected_value, limit]).with_columns(
+            pl.lit(category).alias("source_category"),
+            pl.lit(selected_value).alias("source_value"),
+            pl.lit(drill_category).alias("drill_category")
+        )
+        return drilldown.to_dicts()
 
 # Global instance for caching
 _optimized_queries = None
+_optimized_queries_lock = threading.Lock()
 
 def get_optimized_queries() -> OptimizedMRFQueries:
     """Get singleton instance of optimized queries"""
     global _optimized_queries
     if _optimized_queries is None:
-        _optimized_queries = OptimizedMRFQueries()
+        with _optimized_queries_lock:
+            # Re-check under the lock so concurrent first requests build one instance
+            if _optimized_queries is None:
+                _optimized_queries = OptimizedMRFQueries()
+                # Pick up caches rebuilt by build_query_cache.py while the dashboard runs
+                _optimized_queries.watch_query_cache()
     return _optimized_queries
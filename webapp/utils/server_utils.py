@@ -0,0 +1,95 @@
+"""
+Server Utilities for MRF Webapp
+Helpers for launching the dashboard and detecting when it is ready
+"""
+
+import os
+import socket
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+import uvicorn
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional speedup; responses fall back to stdlib json
+    orjson = None
+
+# Shared pool for startup side-tasks (browser launch, metadata warm-up)
+_BACKGROUND_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="dashboard-bg")
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response serialized with orjson when it is installed"""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+def wait_for_port(host: str, port: int, timeout: float = 30.0) -> bool:
+    """Block until a TCP server accepts connections on host:port, or timeout expires"""
+    deadline = time.monotonic() + timeout
+    delay = 0.05
+
+    while True:
+        try:
+            with socket.create_connection((host, port), timeout=0.2):
+                return True
+        except OSError:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            # Exponential backoff, capped so a slow start is still noticed quickly
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, 1.0)
+
+
+def bind_listen_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    """Bind and listen on a TCP socket for the server, reclaiming a port left in TIME_WAIT by a restart"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    # On Windows SO_REUSEADDR would let us steal a port that is actively in use
+    if os.name != "nt":
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    try:
+        sock.bind((host, port))
+        # Listening now means early connections queue until the app starts serving
+        sock.listen(backlog)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def default_worker_count() -> int:
+    """Worker processes for the dashboard: one per CPU, capped at 4 to bound DuckDB memory"""
+    return min(4, os.cpu_count() or 1)
+
+
+def serve_on_socket(app: str, sock: socket.socket, workers: int = 1, **options: Any):
+    """Run uvicorn on a pre-bound socket through its public API, with `workers` processes when > 1
+    
+    `app` must be an import string, since workers re-import it. uvicorn can't take a socket by
+    file descriptor on Windows, so there it serves from a single process.
+    """
+    if workers > 1 and os.name != "nt":
+        # Workers inherit the listening socket through its file descriptor
+        uvicorn.run(app, fd=sock.fileno(), workers=workers, **options)
+    else:
+        uvicorn.Server(uvicorn.Config(app, **options)).run(sockets=[sock])
+
+
+def _report_failure(future: Future):
+    """Print the error from a background task instead of losing it with its thread"""
+    if not future.cancelled() and future.exception() is not None:
+        print(f"⚠️  Background task failed: {future.exception()}")
+
+
+def run_in_background(fn: Callable[..., Any], *args: Any) -> Future:
+    """Run fn on the shared background pool, returning its future"""
+    future = _BACKGROUND_POOL.submit(fn, *args)
+    future.add_done_callback(_report_failure)
+    return future